@@ -0,0 +1,71 @@
+# benchmarks/bench_grammar.py
+"""
+Cost benchmark for the local grammar scorer, with a budget check.
+
+    python -m benchmarks.bench_grammar --summaries 500 --budget-ms 2.0
+
+Times `GrammarScorer.score` per summary and `score_many` over the whole
+cohort, and exits non-zero if the p95 per-summary cost exceeds the budget
+(default 2 ms for a typical 80-250 word summary), so it can gate CI.
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from benchmarks.corpus import make_corpus
+from benchmarks.stats import summarize_latencies, write_report
+from services.grammar_scorer import GrammarScorer
+
+# Typical slips, so the rules do real work rather than scanning clean text
+_NOISE = ["recieve", "alot", "could of", "the the", "i", " ,", "!!", "a enzyme", "seperate", "more then"]
+
+def _add_noise(rng: random.Random, text: str, rate: float = 0.03) -> str:
+    words = text.split()
+    for _ in range(int(len(words) * rate)):
+        words.insert(rng.randrange(len(words) + 1), rng.choice(_NOISE))
+    return " ".join(words)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--summaries", type=int, default=500)
+    parser.add_argument("--budget-ms", type=float, default=2.0, help="Maximum p95 cost per summary.")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    _, summaries = make_corpus(num_summaries=args.summaries, transcript_words=2000)
+    summaries = [_add_noise(rng, summary) for summary in summaries]
+    scorer = GrammarScorer()
+    scorer.score_many(summaries[:10]) # Warm up
+
+    latencies = []
+    for summary in summaries:
+        started = time.perf_counter()
+        scorer.score(summary)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    reports = scorer.score_many(summaries)
+    batch_ms = (time.perf_counter() - started) * 1000
+
+    single = summarize_latencies(latencies)
+    within_budget = single["p95_ms"] <= args.budget_ms
+    write_report("grammar", {
+        "config": vars(args),
+        "single": single,
+        "batch": {
+            "total_ms": round(batch_ms, 3),
+            "per_summary_ms": round(batch_ms / len(summaries), 4)
+        },
+        "mean_score": round(sum(r.score for r in reports) / len(reports), 3),
+        "within_budget": within_budget
+    }, args.output)
+
+    if not within_budget:
+        print(f"Grammar scorer p95 {single['p95_ms']} ms exceeds the {args.budget_ms} ms budget.", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# benchmarks/bench_stages.py
+"""
+Per-stage microbenchmarks for the evaluation pipeline.
+
+    python -m benchmarks.bench_stages --stages scoring,qualitative,semantic --output stages.json
+
+LLM-backed stages use FakeLLMClient, so timings reflect this service's own
+overhead plus the configured fake latency, with no network noise.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Callable, Dict, List
+
+# Settings require an API key at import time; the fake client never uses it
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-not-used")
+
+from benchmarks.corpus import make_corpus
+from benchmarks.fake_llm import FakeLLMClient
+from benchmarks.stats import summarize_latencies, write_report
+from schemas import EvaluationParameter
+
+async def _time_async(fn: Callable, iterations: int) -> List[float]:
+    latencies = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        await fn(i)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+def _time_sync(fn: Callable, iterations: int) -> List[float]:
+    latencies = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        fn(i)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+def bench_scoring(iterations: int) -> Dict[str, float]:
+    from services.scoring_engine import ScoringEngine
+
+    engine = ScoringEngine()
+    raw_scores = {"coverage": 0.7, "relevance": 0.82, "clarity": 4.0, "coherence": 3.5, "conciseness": 4.5, "grammar": 4.0}
+    return summarize_latencies(_time_sync(lambda _: engine.calculate_final_score(raw_scores), iterations))
+
+async def bench_qualitative(iterations: int, transcript: str, summaries: List[str], latency_ms: float) -> Dict[str, float]:
+    from services.qualitative_analyzer import QualitativeAnalyzer
+
+    analyzer = QualitativeAnalyzer(FakeLLMClient(latency_ms=latency_ms, jitter_ms=0.0))
+    parameters = list(EvaluationParameter)
+
+    async def run(i: int):
+        await analyzer.analyze(summaries[i % len(summaries)], transcript, parameters)
+
+    result = summarize_latencies(await _time_async(run, iterations))
+    result["llm_calls"] = analyzer.llm_client.calls
+    return result
+
+async def bench_semantic(iterations: int, transcript: str, summaries: List[str], key_concepts: List[str]) -> Dict[str, Dict[str, float]]:
+    from services.semantic_analyzer import SemanticAnalyzer
+
+    analyzer = SemanticAnalyzer()
+    results = {}
+    try:
+        # The first call pays for model warm-up and for embedding the transcript chunks and concepts
+        started = time.perf_counter()
+        await analyzer.analyze(summaries[0], transcript, key_concepts)
+        results["first_call_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+        async def run(i: int):
+            await analyzer.analyze(summaries[i % len(summaries)], transcript, key_concepts)
+
+        results["warm"] = summarize_latencies(await _time_async(run, iterations))
+        if analyzer.cache is not None:
+            results["cache"] = analyzer.cache.stats()
+    finally:
+        await analyzer.close()
+    return results
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", default="scoring,qualitative,semantic", help="Comma-separated stages to run.")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--transcript-words", type=int, default=8000)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Fake LLM latency for the qualitative stage.")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args()
+
+    transcript, summaries = make_corpus(num_summaries=max(args.iterations, 1), transcript_words=args.transcript_words)
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    results = {}
+
+    if "scoring" in stages:
+        results["scoring"] = bench_scoring(args.iterations * 100)
+    if "qualitative" in stages:
+        results["qualitative"] = await bench_qualitative(args.iterations, transcript, summaries, args.llm_latency_ms)
+    if "semantic" in stages:
+        from benchmarks.fake_llm import fake_completion
+        import json
+        key_concepts = json.loads(fake_completion(f"JSON array of strings\nTranscript:\n{transcript}"))
+        results["semantic"] = await bench_semantic(args.iterations, transcript, summaries, key_concepts)
+
+    write_report("stages", {"config": vars(args), "stages": results}, args.output)
+
+if __name__ == "__main__":
+    asyncio.run(main())
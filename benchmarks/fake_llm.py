@@ -0,0 +1,76 @@
+# benchmarks/fake_llm.py
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+from typing import AsyncIterator, Callable, Optional
+
+def _stable_fraction(text: str) -> float:
+    """A deterministic value in [0, 1) derived from the text."""
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16) / 0x100000000
+
+def fake_completion(prompt: str) -> str:
+    """
+    Returns a deterministic, well-formed response for any prompt the services
+    send: a JSON concept list, a JSON rating object, or a feedback paragraph.
+    """
+    if "JSON array of strings" in prompt:
+        transcript = prompt.split("Transcript:", 1)[-1]
+        words = [w for w in re.findall(r"[a-z]{5,}", transcript.lower())]
+        # Pick a handful of distinct content words as stand-in concepts
+        concepts = list(dict.fromkeys(words))[:24:3] or ["general overview"]
+        return json.dumps([f"The role of {word} in the lecture" for word in concepts])
+    if "quality names" in prompt:
+        parameters = re.findall(r"^- (\w+): ", prompt.split("Evaluation Questions:", 1)[-1], flags=re.MULTILINE)
+        return json.dumps({p: round(1.0 + 4.0 * _stable_fraction(p + prompt[-200:]), 1) for p in parameters})
+    if "'score'" in prompt:
+        return json.dumps({"score": round(1.0 + 4.0 * _stable_fraction(prompt[-200:]), 1)})
+    return (
+        "Your summary captures the lecture's central argument clearly and in your own words. "
+        "To strengthen it, connect the supporting examples back to the main claim and trim "
+        "repeated points so each sentence adds something new."
+    )
+
+class FakeLLMError(Exception):
+    """Injected failure raised by FakeLLMClient."""
+
+class FakeLLMClient:
+    """
+    A drop-in stand-in for LLMClient with configurable latency and failure
+    injection. Responses are deterministic for a given prompt.
+    """
+
+    def __init__(self, latency_ms: float = 300.0, jitter_ms: float = 100.0, failure_rate: float = 0.0, seed: Optional[int] = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.failures = 0
+
+    async def _simulate_call(self):
+        self.calls += 1
+        delay_ms = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms))
+        await asyncio.sleep(delay_ms / 1000.0)
+        if self._random.random() < self.failure_rate:
+            self.failures += 1
+            raise FakeLLMError("Injected LLM failure.")
+
+    async def generate_text(
+        self,
+        prompt: str,
+        temperature: float = 0.5,
+        max_tokens: int = 1500,
+        caller: str = "unknown",
+        validate: Optional[Callable[[str], bool]] = None,
+        bypass_cache: bool = False
+    ) -> str:
+        await self._simulate_call()
+        return fake_completion(prompt)
+
+    async def stream_text(self, prompt: str, temperature: float = 0.5, max_tokens: int = 1500, caller: str = "unknown") -> AsyncIterator[str]:
+        await self._simulate_call()
+        for token in re.findall(r"\S+\s*", fake_completion(prompt)):
+            yield token
@@ -0,0 +1,92 @@
+# benchmarks/fake_openai_server.py
+"""
+A local OpenAI-compatible chat completions server for load testing without
+paying for (or being rate limited by) the real API.
+
+Run it, then point the service at it:
+
+    uvicorn benchmarks.fake_openai_server:app --port 9000
+    LLM_BASE_URL=http://127.0.0.1:9000/v1 uvicorn ...
+
+Latency and failures are configured with FAKE_LLM_LATENCY_MS,
+FAKE_LLM_JITTER_MS, FAKE_LLM_FAILURE_RATE (HTTP 500) and
+FAKE_LLM_RATE_LIMIT_RATE (HTTP 429 with Retry-After).
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from benchmarks.fake_llm import fake_completion
+
+LATENCY_MS = float(os.environ.get("FAKE_LLM_LATENCY_MS", "300"))
+JITTER_MS = float(os.environ.get("FAKE_LLM_JITTER_MS", "100"))
+FAILURE_RATE = float(os.environ.get("FAKE_LLM_FAILURE_RATE", "0"))
+RATE_LIMIT_RATE = float(os.environ.get("FAKE_LLM_RATE_LIMIT_RATE", "0"))
+
+app = FastAPI(title="Fake OpenAI-compatible API")
+
+def _usage(prompt: str, completion: str) -> dict:
+    prompt_tokens = len(prompt) // 4
+    completion_tokens = len(completion) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    await asyncio.sleep(max(0.0, LATENCY_MS + random.uniform(-JITTER_MS, JITTER_MS)) / 1000.0)
+
+    roll = random.random()
+    if roll < RATE_LIMIT_RATE:
+        return JSONResponse(
+            status_code=429,
+            headers={"retry-after": "1"},
+            content={"error": {"message": "Rate limit reached (fake).", "type": "rate_limit_error"}}
+        )
+    if roll < RATE_LIMIT_RATE + FAILURE_RATE:
+        return JSONResponse(
+            status_code=500,
+            content={"error": {"message": "Injected server error (fake).", "type": "server_error"}}
+        )
+
+    prompt = body["messages"][-1]["content"]
+    text = fake_completion(prompt)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+    model = body.get("model", "fake-model")
+
+    if body.get("stream"):
+        async def events():
+            for token in re.findall(r"\S+\s*", text):
+                chunk = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+            done = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+            }
+            yield f"data: {json.dumps(done)}\n\n"
+            yield "data: [DONE]\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": _usage(prompt, text)
+    }
@@ -0,0 +1,90 @@
+# benchmarks/load_test.py
+"""
+HTTP load driver for the evaluation API.
+
+Start the fake LLM server and the API pointed at it, then:
+
+    python -m benchmarks.load_test --url http://127.0.0.1:8000/evaluate --concurrency 1,8,32 --requests 200
+
+Each concurrency level runs that many closed-loop clients until the request
+count is reached, and reports latency percentiles and requests/sec as JSON.
+Raise LLM_REQUESTS_PER_MINUTE / LLM_TOKENS_PER_MINUTE on the API under test
+when measuring the service itself, or the client-side rate limiter will be
+the bottleneck.
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.corpus import make_corpus
+from benchmarks.stats import summarize_latencies, write_report
+
+async def run_level(url: str, payloads: List[Dict[str, Any]], concurrency: int, total_requests: int, timeout: float) -> Dict[str, Any]:
+    counter = itertools.count()
+    latencies: List[float] = []
+    status_counts: Dict[str, int] = {}
+
+    async def client(http: httpx.AsyncClient):
+        while True:
+            i = next(counter)
+            if i >= total_requests:
+                return
+            started = time.perf_counter()
+            try:
+                response = await http.post(url, json=payloads[i % len(payloads)])
+                key = str(response.status_code)
+            except httpx.HTTPError as e:
+                key = e.__class__.__name__
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            status_counts[key] = status_counts.get(key, 0) + 1
+            if key == "200":
+                latencies.append(elapsed_ms)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as http:
+        started = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(concurrency)))
+        wall_seconds = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "wall_seconds": round(wall_seconds, 3),
+        "requests_per_second": round(total_requests / wall_seconds, 3) if wall_seconds else 0.0,
+        "successful_requests_per_second": round(len(latencies) / wall_seconds, 3) if wall_seconds else 0.0,
+        "status_counts": status_counts,
+        "latency": summarize_latencies(latencies)
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000/evaluate")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level.")
+    parser.add_argument("--transcript-words", type=int, default=8000)
+    parser.add_argument("--distinct-summaries", type=int, default=100)
+    parser.add_argument("--parameters", default="clarity,coherence,conciseness,grammar")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args()
+
+    transcript, summaries = make_corpus(num_summaries=args.distinct_summaries, transcript_words=args.transcript_words)
+    parameters = [p.strip() for p in args.parameters.split(",") if p.strip()]
+    payloads = [
+        {"lecture_transcript": transcript, "student_summary": summary, "evaluation_parameters": parameters}
+        for summary in summaries
+    ]
+
+    levels = []
+    for concurrency in (int(c) for c in args.concurrency.split(",")):
+        levels.append(await run_level(args.url, payloads, concurrency, args.requests, args.timeout))
+
+    write_report("load", {"config": vars(args), "levels": levels}, args.output)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+# benchmarks/stats.py
+
+import json
+import platform
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+def summarize_latencies(latencies_ms: List[float]) -> Dict[str, float]:
+    """Latency percentiles in milliseconds."""
+    if not latencies_ms:
+        return {"count": 0}
+    values = np.asarray(latencies_ms, dtype=np.float64)
+    return {
+        "count": int(values.size),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3)
+    }
+
+def write_report(name: str, results: Any, output: Optional[str] = None) -> Dict[str, Any]:
+    """Wraps results with run metadata and writes them as JSON (to stdout if no path is given)."""
+    report = {
+        "benchmark": name,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results
+    }
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return report
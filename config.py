@@ -1,5 +1,6 @@
 # config.py
 
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -9,8 +10,151 @@ class Settings(BaseSettings):
 
     OPENAI_API_KEY: str
     LLM_MODEL_NAME: str = "gpt-4o-mini"
+    # Point at any OpenAI-compatible server (e.g. a local fake for load testing)
+    LLM_BASE_URL: Optional[str] = None
+    LLM_REQUEST_TIMEOUT_SECONDS: float = 60.0
+
+    # Client-side LLM scheduling: at most LLM_MAX_CONCURRENCY requests in
+    # flight, paced by token buckets for requests/min and (estimated)
+    # tokens/min. Transient errors are retried with exponential backoff and
+    # jitter, honouring Retry-After; after LLM_CIRCUIT_FAILURE_THRESHOLD
+    # consecutive failures calls fail fast for LLM_CIRCUIT_RESET_SECONDS.
+    LLM_MAX_CONCURRENCY: int = 32
+    LLM_REQUESTS_PER_MINUTE: float = 500
+    LLM_TOKENS_PER_MINUTE: float = 200000
+    LLM_MAX_RETRIES: int = 4
+    LLM_BACKOFF_BASE_SECONDS: float = 0.5
+    LLM_BACKOFF_MAX_SECONDS: float = 20.0
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    LLM_CIRCUIT_RESET_SECONDS: float = 30.0
+
+    # LLM response cache: 'memory' (LRU with TTL), 'sqlite' (local disk) or
+    # 'none'. Only calls at or below LLM_CACHE_MAX_TEMPERATURE are cached or
+    # coalesced with identical in-flight requests.
+    LLM_CACHE_BACKEND: str = "memory"
+    LLM_CACHE_MAX_ENTRIES: int = 10000
+    LLM_CACHE_TTL_SECONDS: float = 6 * 3600
+    LLM_CACHE_SQLITE_PATH: str = "data/llm_cache.sqlite3"
+    LLM_CACHE_MAX_TEMPERATURE: float = 0.2
     EMBEDDING_MODEL_NAME: str = "all-MiniLM-L6-v2"
 
+    # Embedding backend: 'torch' (GPU if available), 'torch-int8' (dynamically
+    # quantized, CPU) or 'onnx' (ONNX Runtime, CPU; needs optimum[onnxruntime]).
+    # The model is loaded by the startup warmup, not at import time.
+    EMBEDDING_BACKEND: str = "torch"
+    EMBEDDING_NUM_THREADS: Optional[int] = None
+    EMBEDDING_ONNX_FILE_NAME: Optional[str] = None
+
+    # Shared embedding server for multi-worker deployments. With
+    # EMBEDDING_BACKEND='remote', workers send encode requests to the process
+    # started by `python -m utils.embedding_server` over this Unix socket and
+    # receive vectors via shared memory. The server batches across workers
+    # using EMBEDDING_SERVER_BACKEND. Results up to
+    # EMBEDDING_SERVER_INLINE_MAX_BYTES are sent inline on the socket instead;
+    # shared memory blocks not released by the client within
+    # EMBEDDING_SERVER_SHM_TTL_SECONDS (or by disconnecting) are unlinked.
+    EMBEDDING_SERVER_SOCKET: str = "/tmp/summary-eval-embeddings.sock"
+    EMBEDDING_SERVER_BACKEND: str = "torch"
+    EMBEDDING_SERVER_MAX_BATCH_SIZE: int = 128
+    EMBEDDING_SERVER_MAX_WAIT_MS: float = 5.0
+    EMBEDDING_SERVER_INLINE_MAX_BYTES: int = 65536
+    EMBEDDING_SERVER_SHM_TTL_SECONDS: float = 60.0
+
+    # Embedding micro-batching: concurrent encode requests are merged into one
+    # batch of up to EMBEDDING_MAX_BATCH_SIZE texts, waiting at most
+    # EMBEDDING_MAX_WAIT_MS for more requests to arrive.
+    EMBEDDING_MAX_BATCH_SIZE: int = 64
+    EMBEDDING_MAX_WAIT_MS: float = 5.0
+    EMBEDDING_WORKERS: int = 1
+
+    # Content-addressed embedding cache (keyed by model + text). Vectors are
+    # kept as float16/float32 within a byte budget and, if EMBEDDING_CACHE_DIR
+    # is set, persisted to disk so they survive restarts.
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    EMBEDDING_CACHE_DTYPE: str = "float16"
+    EMBEDDING_CACHE_DIR: Optional[str] = None
+
+    # Long transcripts are split into overlapping word windows (sized to stay
+    # under the encoder's 256 word-piece limit) instead of being truncated.
+    # Relevance pools the summary's similarity to each chunk using 'max',
+    # 'mean' or 'top_k' (mean of the RELEVANCE_TOP_K best chunks).
+    TRANSCRIPT_CHUNKING_ENABLED: bool = True
+    TRANSCRIPT_CHUNK_WORDS: int = 160
+    TRANSCRIPT_CHUNK_OVERLAP_WORDS: int = 32
+    RELEVANCE_POOLING: str = "top_k"
+    RELEVANCE_TOP_K: int = 3
+
+    # Rate all LLM-judged qualitative parameters in a single structured-JSON
+    # call. Criteria that fail to parse are retried together up to
+    # QUALITATIVE_COMBINED_RETRIES times, then rated one call per parameter.
+    QUALITATIVE_COMBINED_RATING: bool = True
+    QUALITATIVE_COMBINED_RETRIES: int = 1
+
+    # Per-stage timeouts (seconds) for the evaluation pipeline. A stage that
+    # times out or fails falls back to a neutral value instead of failing the
+    # request; scoring has no fallback.
+    STAGE_TIMEOUTS: dict = {
+        'concepts': 30.0,
+        'qualitative': 30.0,
+        'semantic': 20.0,
+        'scoring': 5.0,
+        'feedback': 30.0
+    }
+
+    # Asynchronous evaluation jobs: a bounded queue drained by JOB_WORKERS
+    # orchestrator workers. JOB_STORE_BACKEND 'sqlite' keeps jobs and results
+    # in JOB_STORE_SQLITE_PATH so they survive restarts.
+    JOB_QUEUE_MAX_SIZE: int = 1000
+    JOB_WORKERS: int = 4
+    JOB_STORE_BACKEND: str = "memory"
+    JOB_STORE_SQLITE_PATH: str = "data/jobs.sqlite3"
+
+    # Lectures registered with POST /lectures are stored here: their key
+    # concepts and memory-mapped chunk/concept embeddings, built once. At most
+    # LECTURE_MAX_LOADED of them are kept loaded, least recently used first out.
+    LECTURE_STORE_DIR: str = "data/lectures"
+    LECTURE_MAX_LOADED: int = 128
+
+    # Resubmitted or copied summaries (near-duplicates of one already evaluated
+    # for the same lecture and parameters) reuse its scores and feedback instead
+    # of calling the LLM again. Matching uses MinHash over word shingles; the
+    # index keeps at most DUPLICATE_INDEX_MAX_ENTRIES summaries in memory. At
+    # 0.8 a one-word edit matches from about 40 words; a two-word edit only
+    # matches reliably from about 100 words (roughly 2 in 3 at 60 words).
+    DUPLICATE_INDEX_ENABLED: bool = True
+    DUPLICATE_INDEX_MAX_ENTRIES: int = 50000
+    DUPLICATE_SIMILARITY_THRESHOLD: float = 0.8
+
+    # Token budgets for the transcript excerpt in each kind of LLM prompt.
+    # Over budget, only the passages most relevant to the summary and key
+    # concepts are kept. Tokens are counted with tiktoken if it is installed,
+    # else estimated at ~4 characters per token. Unlisted call types get the
+    # whole transcript.
+    PROMPT_TOKEN_BUDGETS: dict = {
+        'qualitative': 3000,
+        'feedback': 2000
+    }
+
+    # evaluation_mode="fast" makes no LLM calls: key concepts are the lecture's
+    # most central sentences (FAST_CONCEPT_COUNT of them, chosen from at most
+    # FAST_CONCEPT_MAX_SENTENCES), qualities come from local text features and
+    # feedback from templates.
+    FAST_CONCEPT_COUNT: int = 8
+    FAST_CONCEPT_MAX_SENTENCES: int = 256
+
+    # Raw stage scores of every evaluation are kept so POST /rescore can
+    # rebuild final scores with new weights without re-running evaluations.
+    # SCORE_STORE_BACKEND is 'sqlite' (SCORE_STORE_SQLITE_PATH) or 'memory'.
+    SCORE_STORE_BACKEND: str = "sqlite"
+    SCORE_STORE_SQLITE_PATH: str = "data/scores.sqlite3"
+
+    # Add a Server-Timing response header with per-stage and total durations
+    METRICS_TIMING_HEADER: bool = True
+
+    # Maximum number of students evaluated concurrently within one batch request
+    BATCH_MAX_CONCURRENCY: int = 16
+
     # Scoring weights (must sum to 1.0 for the weighted average)
     # These can be externalized further if needed
     SCORING_WEIGHTS: dict = {
@@ -1,16 +1,36 @@
 # main.api.py
 
-from fastapi import FastAPI, HTTPException, status
+import json
+import time
+from fastapi import FastAPI, HTTPException, Request, Response, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from contextlib import asynccontextmanager
+import asyncio
 
-from schemas import EvaluationRequest, EvaluationResponse
+from schemas import (
+    EvaluationRequest, EvaluationResponse, BatchEvaluationRequest, BatchEvaluationResponse,
+    JobSubmissionResponse, JobStatusResponse, JobStatus, LectureIngestRequest, LectureResponse,
+    RescoreRequest, RescoreResponse
+)
 from services.evaluation_orchestrator import EvaluationOrchestrator
+from services.job_queue import EvaluationJobQueue, QueueFullError
+from services.lecture_registry import LectureNotFoundError
 from config import settings
 from utils.llm_client import LLMClient
+from utils.job_store import build_job_store
+from utils.metrics import REGISTRY, HTTP_REQUESTS_IN_FLIGHT, HTTP_REQUEST_DURATION
 
 # Global objects to be initialized at startup
 app_state = {}
 
+def _log_warmup_result(task: asyncio.Task):
+    if task.cancelled():
+        return
+    if task.exception() is not None:
+        print(f"Warmup failed: {task.exception()}")
+    else:
+        print("Warmup complete.")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Initialize shared resources
@@ -18,9 +38,27 @@ async def lifespan(app: FastAPI):
     llm_client = LLMClient(api_key=settings.OPENAI_API_KEY)
     app_state["orchestrator"] = EvaluationOrchestrator(llm_client=llm_client)
     print("Orchestrator initialized.")
+    # Load models in the background: /health answers at once, /ready once warm
+    warmup_task = asyncio.create_task(app_state["orchestrator"].warmup())
+    warmup_task.add_done_callback(_log_warmup_result)
+    job_queue = EvaluationJobQueue(
+        orchestrator=app_state["orchestrator"],
+        store=build_job_store(settings.JOB_STORE_BACKEND, settings.JOB_STORE_SQLITE_PATH),
+        max_queue_size=settings.JOB_QUEUE_MAX_SIZE,
+        num_workers=settings.JOB_WORKERS
+    )
+    await job_queue.start()
+    app_state["job_queue"] = job_queue
+    print("Job queue started.")
     yield
     # Shutdown
     print("Shutting down...")
+    warmup_task.cancel()
+    await job_queue.stop()
+    orchestrator = app_state.get("orchestrator")
+    if orchestrator:
+        await orchestrator.close()
+    await llm_client.close()
     app_state.clear()
 
 app = FastAPI(
@@ -30,12 +68,54 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+class InFlightMiddleware:
+    """
+    Counts HTTP requests in flight. The ASGI call returns only once the whole
+    response has been sent (streamed bodies such as SSE included) or the client
+    has gone away, so the gauge is decremented deterministically either way.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+
+app.add_middleware(InFlightMiddleware)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        elapsed = time.perf_counter() - started
+        # Label by route template so ids in the path don't create new series
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        HTTP_REQUEST_DURATION.observe(elapsed, path=path, method=request.method, status=str(status_code))
+    if settings.METRICS_TIMING_HEADER:
+        total = f"total;dur={elapsed * 1000:.1f}"
+        existing = response.headers.get("Server-Timing")
+        response.headers["Server-Timing"] = f"{existing}, {total}" if existing else total
+    return response
+
 @app.post("/evaluate", response_model=EvaluationResponse, status_code=status.HTTP_200_OK)
-async def evaluate_summary(request: EvaluationRequest):
+async def evaluate_summary(request: EvaluationRequest, response: Response):
     """
     Evaluates a student's summary based on a lecture transcript.
 
     - **lecture_transcript**: The full text of the original lecture.
+    - **lecture_id**: Alternatively, the id of a lecture registered with `POST /lectures`.
     - **student_summary**: The summary provided by the student.
     - **evaluation_parameters**: A list of qualitative aspects to evaluate (e.g., 'clarity', 'coherence').
     """
@@ -48,7 +128,15 @@ async def evaluate_summary(request: EvaluationRequest):
             )
         
         result = await orchestrator.evaluate(request)
+        if settings.METRICS_TIMING_HEADER and result.metadata:
+            response.headers["Server-Timing"] = ", ".join(
+                f"{stage};dur={ms}" for stage, ms in result.metadata.stage_timings_ms.items()
+            )
         return result
+    except HTTPException:
+        raise
+    except LectureNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
         # Basic error logging
         print(f"An error occurred during evaluation: {e}")
@@ -58,6 +146,210 @@ async def evaluate_summary(request: EvaluationRequest):
             detail=f"An internal error occurred: {str(e)}"
         )
 
+@app.post("/evaluate/stream", status_code=status.HTTP_200_OK)
+async def evaluate_summary_stream(request: EvaluationRequest):
+    """
+    Evaluates a student's summary and streams the results as server-sent events.
+
+    Emits a `score` event for each parameter as soon as its stage finishes, a `scores` event
+    with the final aggregate, `feedback` events carrying the feedback text as it is generated,
+    and a final `complete` event with the full evaluation. Failures are sent as an `error` event.
+    """
+    orchestrator = app_state.get("orchestrator")
+    if not orchestrator:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Orchestration service is not available."
+        )
+    try:
+        # Resolve the lecture up front: once streaming starts the status is already 200
+        await orchestrator.resolve_lecture(request)
+    except LectureNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    async def event_stream():
+        try:
+            async for event, data in orchestrator.evaluate_stream(request):
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except Exception as e:
+            print(f"An error occurred during streaming evaluation: {e}")
+            yield f"event: error\ndata: {json.dumps({'detail': f'An internal error occurred: {str(e)}'})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/evaluate/batch", response_model=BatchEvaluationResponse, status_code=status.HTTP_200_OK)
+async def evaluate_batch(request: BatchEvaluationRequest):
+    """
+    Evaluates a cohort of student summaries against a single lecture transcript.
+
+    - **lecture_transcript**: The full text of the original lecture, shared by every submission.
+    - **lecture_id**: Alternatively, the id of a lecture registered with `POST /lectures`.
+    - **submissions**: The students' summaries, each with a `student_id`.
+    - **evaluation_parameters**: A list of qualitative aspects to evaluate (e.g., 'clarity', 'coherence').
+
+    Submissions that fail are reported individually in `results` with an `error`.
+    """
+    orchestrator = app_state.get("orchestrator")
+    if not orchestrator:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Orchestration service is not available."
+        )
+    try:
+        return await orchestrator.evaluate_many(request)
+    except LectureNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        print(f"An error occurred during batch evaluation: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal error occurred: {str(e)}"
+        )
+
+@app.post("/jobs", response_model=JobSubmissionResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(request: EvaluationRequest):
+    """
+    Queues a summary evaluation and returns immediately with a job id.
+
+    Poll `GET /jobs/{job_id}` for the result. When the queue is full the request is rejected
+    with 429; the response reports the current queue depth.
+    """
+    job_queue = app_state.get("job_queue")
+    if not job_queue:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Job queue is not available."
+        )
+    try:
+        # Reject unknown lectures now rather than in a failed job
+        await app_state["orchestrator"].resolve_lecture(request)
+    except LectureNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    try:
+        job_id = await job_queue.submit(request)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={"message": str(e), "queue_depth": e.queue_depth, "max_queue_size": e.max_queue_size},
+            headers={"Retry-After": "5", "X-Queue-Depth": str(e.queue_depth)}
+        )
+    return JobSubmissionResponse(job_id=job_id, status=JobStatus.QUEUED, queue_depth=job_queue.depth)
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse, status_code=status.HTTP_200_OK)
+async def get_job(job_id: str):
+    """Returns the status of a queued evaluation job, with its result once completed."""
+    job_queue = app_state.get("job_queue")
+    if not job_queue:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Job queue is not available."
+        )
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job '{job_id}' not found.")
+    return JobStatusResponse(
+        job_id=job["job_id"],
+        status=job["status"],
+        result=job["result"],
+        error=job["error"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"]
+    )
+
+def _lecture_response(lecture) -> LectureResponse:
+    return LectureResponse(
+        lecture_id=lecture.lecture_id,
+        key_concepts=lecture.key_concepts,
+        num_chunks=int(lecture.chunk_embeddings.shape[0]),
+        created_at=lecture.created_at
+    )
+
+@app.post("/lectures", response_model=LectureResponse, status_code=status.HTTP_201_CREATED)
+async def register_lecture(request: LectureIngestRequest):
+    """
+    Registers a lecture transcript: extracts its key concepts and embeds it once.
+
+    Pass the returned `lecture_id` instead of `lecture_transcript` to the evaluation endpoints
+    to skip that work on every request. Registering the same transcript again returns the same id.
+    """
+    orchestrator = app_state.get("orchestrator")
+    if not orchestrator:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Orchestration service is not available."
+        )
+    try:
+        lecture = await orchestrator.lecture_registry.ingest(request.lecture_transcript)
+    except Exception as e:
+        print(f"An error occurred while registering a lecture: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal error occurred: {str(e)}"
+        )
+    return _lecture_response(lecture)
+
+@app.get("/lectures/{lecture_id}", response_model=LectureResponse)
+async def get_lecture(lecture_id: str):
+    """Returns a registered lecture's key concepts."""
+    orchestrator = app_state.get("orchestrator")
+    if not orchestrator:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Orchestration service is not available."
+        )
+    try:
+        return _lecture_response(await orchestrator.lecture_registry.get(lecture_id))
+    except LectureNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+@app.post("/rescore", response_model=RescoreResponse, status_code=status.HTTP_200_OK)
+async def rescore(request: RescoreRequest):
+    """
+    Recomputes final scores for stored evaluations, by id or for a whole cohort.
+
+    Uses the raw scores recorded when each summary was evaluated, so changing `weights`
+    needs no model or LLM calls.
+    """
+    orchestrator = app_state.get("orchestrator")
+    if not orchestrator:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Orchestration service is not available."
+        )
+    try:
+        result = await orchestrator.rescore(request)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except Exception as e:
+        print(f"An error occurred during re-scoring: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal error occurred: {str(e)}"
+        )
+    if request.cohort_id is not None and not result.results:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No evaluations recorded for cohort '{request.cohort_id}'.")
+    return result
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Service metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/health", status_code=status.HTTP_200_OK)
 async def health_check():
     return {"status": "ok"}
+
+@app.get("/ready", status_code=status.HTTP_200_OK)
+async def readiness_check():
+    """Reports ready once models are loaded and warmed up."""
+    orchestrator = app_state.get("orchestrator")
+    if not orchestrator or not orchestrator.ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service is warming up."
+        )
+    return {"status": "ready"}
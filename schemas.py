@@ -1,7 +1,7 @@
 # schemas.py
 
-from pydantic import BaseModel, Field
-from typing import List, Dict
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Dict, Optional
 from enum import Enum
 
 class EvaluationParameter(str, Enum):
@@ -10,11 +10,20 @@ class EvaluationParameter(str, Enum):
     CONCISENESS = 'conciseness'
     GRAMMAR = 'grammar'
 
+class EvaluationMode(str, Enum):
+    FULL = 'full'
+    FAST = 'fast'
+
 class EvaluationRequest(BaseModel):
-    lecture_transcript: str = Field(
-        ..., 
+    lecture_transcript: Optional[str] = Field(
+        None,
         min_length=100, 
-        description="The full text of the lecture transcript."
+        description="The full text of the lecture transcript. Omit when `lecture_id` is given."
+    )
+    lecture_id: Optional[str] = Field(
+        None,
+        min_length=1,
+        description="The id of a lecture registered with POST /lectures, used instead of the transcript."
     )
     student_summary: str = Field(
         ..., 
@@ -25,11 +34,56 @@ class EvaluationRequest(BaseModel):
         ...,
         description="A list of qualitative parameters to evaluate."
     )
+    evaluation_mode: EvaluationMode = Field(
+        EvaluationMode.FULL,
+        description="'full' uses the LLM for concepts, qualitative ratings and feedback; 'fast' uses local models only."
+    )
+    cohort_id: Optional[str] = Field(
+        None,
+        min_length=1,
+        description="Groups evaluations (e.g. a class or assignment) so they can be re-scored together with POST /rescore."
+    )
+
+    @model_validator(mode="after")
+    def check_lecture_source(self):
+        if (self.lecture_transcript is None) == (self.lecture_id is None):
+            raise ValueError("Provide exactly one of 'lecture_transcript' or 'lecture_id'.")
+        return self
 
 class IndividualScore(BaseModel):
     score: float = Field(..., ge=0, le=10, description="The score for this specific parameter (out of 10).")
     explanation: str = Field("", description="A brief explanation for the score, if applicable.")
 
+class NearDuplicateMatch(BaseModel):
+    match_id: str = Field(..., description="Opaque id of the previously evaluated summary this one matched.")
+    similarity: float = Field(..., ge=0, le=1, description="Estimated Jaccard similarity of the two summaries.")
+    student_id: Optional[str] = Field(None, description="The matched submission's student, when it came from a batch.")
+
+class PromptBudgetUsage(BaseModel):
+    budget_tokens: Optional[int] = Field(None, description="The transcript token budget for this call type, if any.")
+    transcript_tokens: int = Field(..., ge=0, description="Tokens in the full transcript.")
+    prompt_transcript_tokens: int = Field(..., ge=0, description="Tokens of transcript actually sent in the prompt.")
+    passages_used: int = Field(..., ge=0, description="Transcript passages included in the prompt.")
+    passages_total: int = Field(..., ge=0, description="Transcript passages available.")
+
+class EvaluationMetadata(BaseModel):
+    stage_timings_ms: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Wall-clock time spent in each pipeline stage, in milliseconds."
+    )
+    fallback_stages: List[str] = Field(
+        default_factory=list,
+        description="Pipeline stages that failed or timed out and used a fallback value."
+    )
+    prompt_budgets: Dict[str, PromptBudgetUsage] = Field(
+        default_factory=dict,
+        description="How the transcript was fitted into each LLM call type's prompt token budget."
+    )
+    near_duplicate: Optional[NearDuplicateMatch] = Field(
+        None,
+        description="Set when the summary nearly duplicates one already evaluated and its scores were reused."
+    )
+
 class EvaluationResponse(BaseModel):
     final_score: float = Field(
         ..., 
@@ -45,3 +99,140 @@ class EvaluationResponse(BaseModel):
         ...,
         description="A breakdown of scores for each evaluated parameter."
     )
+    evaluation_id: Optional[str] = Field(
+        None,
+        description="Identifies the stored raw scores, for re-scoring with POST /rescore."
+    )
+    metadata: Optional[EvaluationMetadata] = Field(
+        None,
+        description="Diagnostic details about how the evaluation was produced."
+    )
+
+class StudentSubmission(BaseModel):
+    student_id: str = Field(..., min_length=1, description="An identifier for the student, echoed back in the results.")
+    student_summary: str = Field(
+        ...,
+        min_length=20,
+        description="The summary written by the student."
+    )
+
+class BatchEvaluationRequest(BaseModel):
+    lecture_transcript: Optional[str] = Field(
+        None,
+        min_length=100,
+        description="The full text of the lecture transcript shared by every submission. Omit when `lecture_id` is given."
+    )
+    lecture_id: Optional[str] = Field(
+        None,
+        min_length=1,
+        description="The id of a lecture registered with POST /lectures, used instead of the transcript."
+    )
+    submissions: List[StudentSubmission] = Field(
+        ...,
+        min_length=1,
+        description="The student summaries to evaluate against the transcript."
+    )
+    evaluation_parameters: List[EvaluationParameter] = Field(
+        ...,
+        description="A list of qualitative parameters to evaluate."
+    )
+    evaluation_mode: EvaluationMode = Field(
+        EvaluationMode.FULL,
+        description="'full' uses the LLM for concepts, qualitative ratings and feedback; 'fast' uses local models only."
+    )
+    cohort_id: Optional[str] = Field(
+        None,
+        min_length=1,
+        description="Groups evaluations (e.g. a class or assignment) so they can be re-scored together with POST /rescore."
+    )
+
+    @model_validator(mode="after")
+    def check_lecture_source(self):
+        if (self.lecture_transcript is None) == (self.lecture_id is None):
+            raise ValueError("Provide exactly one of 'lecture_transcript' or 'lecture_id'.")
+        return self
+
+class BatchEvaluationItem(BaseModel):
+    student_id: str
+    result: Optional[EvaluationResponse] = Field(None, description="The evaluation, if it succeeded.")
+    error: Optional[str] = Field(None, description="The reason the evaluation failed, if it did.")
+
+class BatchEvaluationResponse(BaseModel):
+    results: List[BatchEvaluationItem] = Field(
+        ...,
+        description="One entry per submission, in request order."
+    )
+    succeeded: int = Field(..., ge=0, description="The number of submissions evaluated successfully.")
+    failed: int = Field(..., ge=0, description="The number of submissions that could not be evaluated.")
+
+class JobStatus(str, Enum):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+class JobSubmissionResponse(BaseModel):
+    job_id: str = Field(..., description="The identifier to poll with GET /jobs/{job_id}.")
+    status: JobStatus
+    queue_depth: int = Field(..., ge=0, description="The number of jobs waiting ahead of workers at submission time.")
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: JobStatus
+    result: Optional[EvaluationResponse] = Field(None, description="The evaluation, once the job has completed.")
+    error: Optional[str] = Field(None, description="The reason the job failed, if it did.")
+    created_at: float = Field(..., description="Submission time as a Unix timestamp.")
+    updated_at: float = Field(..., description="Time of the last status change as a Unix timestamp.")
+
+class LectureIngestRequest(BaseModel):
+    lecture_transcript: str = Field(
+        ...,
+        min_length=100,
+        description="The full text of the lecture transcript to register."
+    )
+
+class LectureResponse(BaseModel):
+    lecture_id: str = Field(..., description="Pass this as `lecture_id` to the evaluation endpoints.")
+    key_concepts: List[str] = Field(..., description="The key concepts extracted from the transcript.")
+    num_chunks: int = Field(..., ge=0, description="The number of transcript chunks embedded.")
+    created_at: float = Field(..., description="Ingestion time as a Unix timestamp.")
+
+class RescoreRequest(BaseModel):
+    evaluation_ids: Optional[List[str]] = Field(
+        None,
+        min_length=1,
+        description="The evaluations to re-score. Omit when `cohort_id` is given."
+    )
+    cohort_id: Optional[str] = Field(
+        None,
+        min_length=1,
+        description="Re-score every evaluation recorded under this cohort."
+    )
+    weights: Optional[Dict[str, float]] = Field(
+        None,
+        description="Per-parameter weights overriding the configured ones; the result must sum to 1.0."
+    )
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if (self.evaluation_ids is None) == (self.cohort_id is None):
+            raise ValueError("Provide exactly one of 'evaluation_ids' or 'cohort_id'.")
+        return self
+
+class RescoreItem(BaseModel):
+    evaluation_id: str
+    cohort_id: Optional[str] = None
+    student_id: Optional[str] = None
+    final_score: float = Field(..., ge=0, le=10, description="The final score under the requested weights.")
+    individual_scores: Dict[str, IndividualScore] = Field(
+        ...,
+        description="The stored scores, normalized to 10."
+    )
+
+class RescoreResponse(BaseModel):
+    results: List[RescoreItem] = Field(..., description="One entry per evaluation found.")
+    weights: Dict[str, float] = Field(..., description="The weights the scores were computed with.")
+    missing: List[str] = Field(
+        default_factory=list,
+        description="Requested evaluation ids with no stored scores."
+    )
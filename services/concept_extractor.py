@@ -3,14 +3,33 @@
 from typing import List
 import json
 from utils.llm_client import LLMClient
+from utils.metrics import FALLBACKS
 
 class ConceptExtractor:
     def __init__(self, llm_client: LLMClient):
         self.llm_client = llm_client
 
+    @staticmethod
+    def _parse_response(response_text: str) -> List[str]:
+        # Clean the response to ensure it's valid JSON
+        # LLMs sometimes add markdown backticks
+        cleaned_response = response_text.strip().replace('`json', '').replace('`', '')
+        key_concepts = json.loads(cleaned_response)
+        if isinstance(key_concepts, list) and all(isinstance(c, str) for c in key_concepts):
+            return key_concepts
+        raise ValueError("LLM did not return a valid list of strings.")
+
+    @classmethod
+    def _is_valid_response(cls, response_text: str) -> bool:
+        try:
+            cls._parse_response(response_text)
+            return True
+        except (json.JSONDecodeError, ValueError):
+            return False
+
     async def extract(self, transcript: str) -> List[str]:
         """Extracts key concepts from a lecture transcript using an LLM."""
-        prompt = f"""Analyze the following lecture transcript and identify the main topics, key arguments, and critical conclusions. 
+        prompt = f'''Analyze the following lecture transcript and identify the main topics, key arguments, and critical conclusions. 
 
 Please provide a concise list of these key concepts.
 
@@ -24,23 +43,19 @@ Example response format:
 ]
 
 Transcript:
-"""{transcript}""""""
+"""{transcript}"""'''
 
         try:
             response_text = await self.llm_client.generate_text(
                 prompt=prompt,
                 temperature=0.1, 
-                max_tokens=500
+                max_tokens=500,
+                caller="concept",
+                validate=self._is_valid_response
             )
-            # Clean the response to ensure it's valid JSON
-            # LLMs sometimes add markdown backticks
-            cleaned_response = response_text.strip().replace('`json', '').replace('`', '')
-            key_concepts = json.loads(cleaned_response)
-            if isinstance(key_concepts, list) and all(isinstance(c, str) for c in key_concepts):
-                return key_concepts
-            else:
-                raise ValueError("LLM did not return a valid list of strings.")
+            return self._parse_response(response_text)
         except (json.JSONDecodeError, ValueError) as e:
             print(f"Error decoding key concepts from LLM: {e}")
+            FALLBACKS.inc(component="concepts")
             # Fallback or re-try logic could be implemented here
             return []
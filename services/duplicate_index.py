@@ -0,0 +1,119 @@
+# services/duplicate_index.py
+
+import re
+import threading
+import uuid
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+def shingle_hashes(text: str, shingle_words: int) -> np.ndarray:
+    """32-bit hashes of the distinct word n-grams in the text, ignoring case and punctuation."""
+    tokens = _TOKEN.findall(text.lower())
+    if len(tokens) <= shingle_words:
+        shingles = {" ".join(tokens)} if tokens else set()
+    else:
+        shingles = {" ".join(tokens[i:i + shingle_words]) for i in range(len(tokens) - shingle_words + 1)}
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+@dataclass
+class DuplicateMatch:
+    match_id: str
+    similarity: float
+    payload: Dict[str, Any]
+
+class NearDuplicateIndex:
+    """
+    A MinHash/LSH index of previously evaluated texts, partitioned by scope
+    (e.g. one lecture and parameter set). Signatures are split into bands and
+    bucketed, so a lookup only compares against texts sharing a band; the
+    candidates are then confirmed by estimated Jaccard similarity.
+
+    Holds at most `max_entries` texts across all scopes, evicting the least
+    recently matched first.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 50000,
+        num_perm: int = 128,
+        bands: int = 16,
+        threshold: float = 0.8,
+        shingle_words: int = 3,
+        seed: int = 0
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands.")
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.shingle_words = shingle_words
+        self.bands = bands
+        self._rows = num_perm // bands
+        # Multiply-shift hash family: h(x) = (a * x + b) mod 2^64 >> 32, with odd a
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+        self._entries: "OrderedDict[str, Tuple[str, np.ndarray, Dict[str, Any]]]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, int, bytes], Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """The MinHash signature of a text, or None if it has no words."""
+        hashes = shingle_hashes(text, self.shingle_words)
+        if hashes.size == 0:
+            return None
+        with np.errstate(over="ignore"):
+            permuted = (hashes[:, None] * self._a + self._b) >> np.uint64(32)
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, scope: str, signature: np.ndarray) -> List[Tuple[str, int, bytes]]:
+        return [
+            (scope, band, signature[band * self._rows:(band + 1) * self._rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def query(self, scope: str, signature: np.ndarray) -> Optional[DuplicateMatch]:
+        """The most similar indexed text in the scope at or above the threshold, if any."""
+        with self._lock:
+            candidates: Set[str] = set()
+            for key in self._band_keys(scope, signature):
+                candidates.update(self._buckets.get(key, ()))
+
+            best_id, best_similarity = None, 0.0
+            for entry_id in candidates:
+                similarity = float(np.mean(self._entries[entry_id][1] == signature))
+                if similarity > best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+            if best_id is None or best_similarity < self.threshold:
+                return None
+
+            self._entries.move_to_end(best_id)
+            return DuplicateMatch(match_id=best_id, similarity=round(best_similarity, 3), payload=self._entries[best_id][2])
+
+    def add(self, scope: str, signature: np.ndarray, payload: Dict[str, Any]) -> str:
+        """Indexes a text's signature with the payload to return on later matches."""
+        entry_id = uuid.uuid4().hex
+        with self._lock:
+            self._entries[entry_id] = (scope, signature, payload)
+            for key in self._band_keys(scope, signature):
+                self._buckets.setdefault(key, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._evict_oldest()
+        return entry_id
+
+    def _evict_oldest(self):
+        entry_id, (scope, signature, _) = self._entries.popitem(last=False)
+        for key in self._band_keys(scope, signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
@@ -1,12 +1,33 @@
 # services/evaluation_orchestrator.py
 
-from schemas import EvaluationRequest, EvaluationResponse, IndividualScore
+import asyncio
+import time
+import uuid
+from dataclasses import replace
+from typing import Any, AsyncIterator, List, Dict, Optional, Tuple, Union
+import numpy as np
+from schemas import (
+    EvaluationRequest, EvaluationResponse, IndividualScore,
+    BatchEvaluationRequest, BatchEvaluationResponse, BatchEvaluationItem, EvaluationParameter,
+    EvaluationMetadata, NearDuplicateMatch, PromptBudgetUsage, EvaluationMode,
+    RescoreRequest, RescoreResponse, RescoreItem
+)
 from .concept_extractor import ConceptExtractor
 from .semantic_analyzer import SemanticAnalyzer
 from .qualitative_analyzer import QualitativeAnalyzer
 from .scoring_engine import ScoringEngine
 from .feedback_generator import FeedbackGenerator
+from .pipeline import Stage, run_pipeline
+from .lecture_registry import LectureArtifacts, LectureRegistry
+from .duplicate_index import DuplicateMatch, NearDuplicateIndex
+from .prompt_budget import PromptBudget, PromptBudgetManager
+from .local_concept_extractor import LocalConceptExtractor
+from .local_qualitative_analyzer import LocalQualitativeAnalyzer
+from .template_feedback import TemplateFeedbackGenerator
 from utils.llm_client import LLMClient
+from utils.metrics import DUPLICATE_LOOKUPS, FALLBACKS
+from utils.score_store import build_score_store
+from config import settings
 
 class EvaluationOrchestrator:
     def __init__(self, llm_client: LLMClient):
@@ -15,43 +36,636 @@ class EvaluationOrchestrator:
         self.qualitative_analyzer = QualitativeAnalyzer(llm_client)
         self.scoring_engine = ScoringEngine()
         self.feedback_generator = FeedbackGenerator(llm_client)
+        self.lecture_registry = LectureRegistry(
+            settings.LECTURE_STORE_DIR, self.concept_extractor, self.semantic_analyzer,
+            max_loaded=settings.LECTURE_MAX_LOADED
+        )
+        self.duplicate_index = NearDuplicateIndex(
+            max_entries=settings.DUPLICATE_INDEX_MAX_ENTRIES,
+            threshold=settings.DUPLICATE_SIMILARITY_THRESHOLD
+        ) if settings.DUPLICATE_INDEX_ENABLED else None
+        self.prompt_budget = PromptBudgetManager(self.semantic_analyzer, settings.PROMPT_TOKEN_BUDGETS)
+        # Local stand-ins for the LLM-backed services, used by evaluation_mode="fast"
+        self.local_concept_extractor = LocalConceptExtractor(
+            self.semantic_analyzer,
+            num_concepts=settings.FAST_CONCEPT_COUNT,
+            max_sentences=settings.FAST_CONCEPT_MAX_SENTENCES
+        )
+        self.local_qualitative_analyzer = LocalQualitativeAnalyzer(self.semantic_analyzer, self.qualitative_analyzer.grammar_scorer)
+        self.template_feedback = TemplateFeedbackGenerator()
+        self.score_store = build_score_store(settings.SCORE_STORE_BACKEND, settings.SCORE_STORE_SQLITE_PATH)
+
+    async def resolve_lecture(self, request: Union[EvaluationRequest, BatchEvaluationRequest]) -> LectureArtifacts:
+        """
+        The lecture a request refers to: its registered artifacts for a
+        `lecture_id` (raising LectureNotFoundError if unknown), or just the
+        inline transcript.
+        """
+        if request.lecture_id is not None:
+            return await self.lecture_registry.get(request.lecture_id)
+        return LectureArtifacts(transcript=request.lecture_transcript)
+
+    async def _prompt_transcript(
+        self,
+        call_type: str,
+        summary: str,
+        lecture: LectureArtifacts,
+        key_concepts: Optional[List[str]],
+        prompt_budgets: Dict[str, PromptBudget]
+    ) -> str:
+        """The transcript excerpt for one call type's prompt, recording the budget used."""
+        try:
+            text, budget = await self.prompt_budget.fit_transcript(
+                call_type, lecture.transcript, summary,
+                key_concepts=key_concepts,
+                chunk_embeddings=lecture.chunk_embeddings
+            )
+        except Exception as e:
+            print(f"Error fitting the transcript to the {call_type} prompt budget: {e}")
+            FALLBACKS.inc(component="prompt_budget")
+            return lecture.transcript
+        prompt_budgets[call_type] = budget
+        return text
+
+    @staticmethod
+    def _budget_metadata(prompt_budgets: Dict[str, PromptBudget]) -> Dict[str, PromptBudgetUsage]:
+        return {
+            call_type: PromptBudgetUsage(
+                budget_tokens=budget.budget_tokens,
+                transcript_tokens=budget.transcript_tokens,
+                prompt_transcript_tokens=budget.prompt_transcript_tokens,
+                passages_used=budget.passages_used,
+                passages_total=budget.passages_total
+            )
+            for call_type, budget in prompt_budgets.items()
+        }
+
+    @staticmethod
+    def _duplicate_scope(request: Union[EvaluationRequest, BatchEvaluationRequest], lecture: LectureArtifacts) -> str:
+        # Scores are only reusable for the same lecture, parameters and evaluation mode
+        lecture_key = lecture.lecture_id or LectureRegistry.lecture_id_for(lecture.transcript)
+        parameters = ','.join(sorted(p.value for p in request.evaluation_parameters))
+        return f"{lecture_key}:{parameters}:{request.evaluation_mode.value}"
+
+    def _find_duplicate(self, scope: str, summary: str) -> Tuple[Optional[DuplicateMatch], Any]:
+        """Looks the summary up in the near-duplicate index; also returns its signature for indexing."""
+        if self.duplicate_index is None:
+            return None, None
+        signature = self.duplicate_index.signature(summary)
+        match = self.duplicate_index.query(scope, signature) if signature is not None else None
+        DUPLICATE_LOOKUPS.inc(result="hit" if match is not None else "miss")
+        return match, signature
+
+    @staticmethod
+    def _with_rating_fallbacks(fallback_stages: List[str], rating_fallbacks: List[str]) -> List[str]:
+        """The stage fallbacks, plus 'qualitative' if any LLM rating used the neutral score."""
+        fallback_stages = list(fallback_stages)
+        if rating_fallbacks and "qualitative" not in fallback_stages:
+            fallback_stages.append("qualitative")
+        return fallback_stages
+
+    def _remember(
+        self,
+        scope: str,
+        signature: Any,
+        raw_scores: Dict[str, float],
+        feedback: str,
+        student_id: Optional[str] = None
+    ) -> Optional[DuplicateMatch]:
+        """Indexes a completed evaluation, unless it relied on fallback values."""
+        if self.duplicate_index is None or signature is None or feedback == FeedbackGenerator.FALLBACK_FEEDBACK:
+            return None
+        payload = {"raw_scores": raw_scores, "feedback": feedback, "student_id": student_id}
+        return DuplicateMatch(match_id=self.duplicate_index.add(scope, signature, payload), similarity=1.0, payload=payload)
+
+    def _duplicate_response(
+        self,
+        match: DuplicateMatch,
+        summary: str,
+        started: float
+    ) -> Tuple[EvaluationResponse, Dict[str, float]]:
+        """
+        Builds a response from a near-duplicate's stored scores and feedback,
+        without any LLM calls. Also returns the raw scores it was built from.
+        """
+        raw_scores = dict(match.payload["raw_scores"])
+        if "grammar" in raw_scores:
+            # Grammar is local and cheap, and the edits may have fixed (or added) slips
+            raw_scores["grammar"] = self.qualitative_analyzer.grammar_scorer.score(summary).score
+        final_score, individual_scores_out_of_10 = self.scoring_engine.calculate_final_score(raw_scores)
+        return EvaluationResponse(
+            evaluation_id=uuid.uuid4().hex,
+            final_score=final_score,
+            feedback=match.payload["feedback"],
+            individual_scores={k: IndividualScore(score=v) for k, v in individual_scores_out_of_10.items()},
+            metadata=EvaluationMetadata(
+                stage_timings_ms={"duplicate_lookup": round((time.perf_counter() - started) * 1000, 2)},
+                near_duplicate=NearDuplicateMatch(
+                    match_id=match.match_id,
+                    similarity=match.similarity,
+                    student_id=match.payload.get("student_id")
+                )
+            )
+        ), raw_scores
+
+    def _score_record(
+        self,
+        response: EvaluationResponse,
+        raw_scores: Dict[str, float],
+        cohort_id: Optional[str],
+        student_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """The score store record for an evaluation's raw scores."""
+        return {
+            "evaluation_id": response.evaluation_id, "cohort_id": cohort_id,
+            "student_id": student_id, "raw_scores": raw_scores
+        }
+
+    async def _save_scores(self, records: List[Dict[str, Any]]):
+        """
+        Persists raw scores for re-scoring, in a worker thread since the store
+        may write to disk. A storage failure doesn't fail the evaluation.
+        """
+        try:
+            await asyncio.to_thread(self.score_store.save_many, records)
+        except Exception as e:
+            print(f"Error saving raw scores: {e}")
+            FALLBACKS.inc(component="score_store")
+
+    def _build_stages(
+        self,
+        request: EvaluationRequest,
+        lecture: LectureArtifacts,
+        prompt_budgets: Dict[str, PromptBudget],
+        rating_fallbacks: List[str]
+    ) -> List[Stage]:
+        """
+        Declares the evaluation pipeline as a stage graph. Concept extraction and
+        the qualitative LLM ratings do not depend on each other and run concurrently.
+        The transcript is fitted to each LLM prompt's budget, recorded in `prompt_budgets`.
+        LLM ratings that fell back to a neutral score are recorded in `rating_fallbacks`.
+        In fast mode every stage runs locally, without the LLM.
+        """
+        timeouts = settings.STAGE_TIMEOUTS
+        summary = request.student_summary
+        transcript = lecture.transcript
+        parameters = request.evaluation_parameters
+        fast = request.evaluation_mode == EvaluationMode.FAST
+
+        async def extract_concepts(_):
+            # 1. Extract key concepts from the transcript (precomputed for registered lectures)
+            if lecture.key_concepts is not None:
+                return lecture.key_concepts
+            if fast:
+                return await self.local_concept_extractor.extract(transcript)
+            return await self.concept_extractor.extract(transcript)
+
+        async def analyze_semantics(inputs):
+            # 2. Perform semantic analysis (Coverage & Relevance)
+            return await self.semantic_analyzer.analyze(
+                summary=summary,
+                transcript=transcript,
+                key_concepts=inputs["concepts"],
+                transcript_embeddings=lecture.chunk_embeddings,
+                concept_embeddings=lecture.concept_embeddings
+            )
+
+        async def analyze_qualitative(_):
+            # 3. Perform qualitative analysis
+            if fast:
+                return await self.local_qualitative_analyzer.analyze(summary, transcript, parameters)
+            prompt_transcript = transcript
+            if any(p != EvaluationParameter.GRAMMAR for p in parameters):
+                # Runs alongside concept extraction, so only registered lectures' concepts are known yet
+                prompt_transcript = await self._prompt_transcript(
+                    "qualitative", summary, lecture, lecture.key_concepts, prompt_budgets
+                )
+            return await self.qualitative_analyzer.analyze(
+                summary=summary,
+                transcript=prompt_transcript,
+                parameters=parameters,
+                fallbacks=rating_fallbacks
+            )
+
+        async def score(inputs):
+            # 4. Aggregate scores using the scoring engine
+            all_raw_scores = {**inputs["semantic"], **inputs["qualitative"]}
+            return self.scoring_engine.calculate_final_score(all_raw_scores)
+
+        async def generate_feedback(inputs):
+            # 5. Generate human-readable feedback
+            _, individual_scores_out_of_10 = inputs["scoring"]
+            if fast:
+                return self.template_feedback.generate(individual_scores_out_of_10)
+            return await self.feedback_generator.generate(
+                individual_scores=individual_scores_out_of_10,
+                summary=summary,
+                transcript=await self._prompt_transcript("feedback", summary, lecture, inputs["concepts"], prompt_budgets)
+            )
+
+        return [
+            Stage("concepts", extract_concepts, timeout=timeouts.get("concepts"),
+                  fallback=lambda _: []),
+            Stage("qualitative", analyze_qualitative, timeout=timeouts.get("qualitative"),
+                  fallback=lambda _: {p.value: 2.5 for p in parameters}),
+            Stage("semantic", analyze_semantics, depends_on=["concepts"], timeout=timeouts.get("semantic"),
+                  fallback=lambda _: {"coverage": 0.0, "relevance": 0.0}),
+            Stage("scoring", score, depends_on=["semantic", "qualitative"], timeout=timeouts.get("scoring")),
+            Stage("feedback", generate_feedback, depends_on=["scoring", "concepts"], timeout=timeouts.get("feedback"),
+                  fallback=lambda _: FeedbackGenerator.FALLBACK_FEEDBACK),
+        ]
 
     async def evaluate(self, request: EvaluationRequest) -> EvaluationResponse:
-        # 1. Extract key concepts from the transcript
-        key_concepts = await self.concept_extractor.extract(request.lecture_transcript)
-        
-        # 2. Perform semantic analysis (Coverage & Relevance)
-        semantic_scores = self.semantic_analyzer.analyze(
-            summary=request.student_summary, 
-            transcript=request.lecture_transcript, 
-            key_concepts=key_concepts
+        started = time.perf_counter()
+        lecture = await self.resolve_lecture(request)
+        scope = self._duplicate_scope(request, lecture)
+        match, signature = self._find_duplicate(scope, request.student_summary)
+        if match is not None:
+            response, raw_scores = self._duplicate_response(match, request.student_summary, started)
+            await self._save_scores([self._score_record(response, raw_scores, request.cohort_id)])
+            return response
+
+        prompt_budgets: Dict[str, PromptBudget] = {}
+        rating_fallbacks: List[str] = []
+        pipeline = await run_pipeline(self._build_stages(request, lecture, prompt_budgets, rating_fallbacks))
+
+        final_score, individual_scores_out_of_10 = pipeline.results["scoring"]
+        fallback_stages = self._with_rating_fallbacks(pipeline.fallback_stages, rating_fallbacks)
+
+        # 6. Format the final response
+        response = EvaluationResponse(
+            evaluation_id=uuid.uuid4().hex,
+            final_score=final_score,
+            feedback=pipeline.results["feedback"],
+            individual_scores={k: IndividualScore(score=v) for k, v in individual_scores_out_of_10.items()},
+            metadata=EvaluationMetadata(
+                stage_timings_ms=pipeline.timings_ms,
+                fallback_stages=fallback_stages,
+                prompt_budgets=self._budget_metadata(prompt_budgets)
+            )
         )
+        raw_scores = {**pipeline.results["semantic"], **pipeline.results["qualitative"]}
+        await self._save_scores([self._score_record(response, raw_scores, request.cohort_id)])
+        if not fallback_stages and pipeline.results["concepts"]:
+            self._remember(scope, signature, raw_scores, response.feedback)
         
-        # 3. Perform qualitative analysis
+        return response
+
+    async def evaluate_stream(self, request: EvaluationRequest) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Runs the evaluation and yields (event, data) pairs as results become
+        available: a 'score' event per parameter as soon as its stage finishes,
+        a 'scores' event with the aggregate, 'feedback' events carrying the
+        feedback text token by token, and a final 'complete' event with the
+        full EvaluationResponse.
+        """
+        started = time.perf_counter()
+        lecture = await self.resolve_lecture(request)
+        scope = self._duplicate_scope(request, lecture)
+        match, signature = self._find_duplicate(scope, request.student_summary)
+        if match is not None:
+            response, raw_scores = self._duplicate_response(match, request.student_summary, started)
+            await self._save_scores([self._score_record(response, raw_scores, request.cohort_id)])
+            individual_scores_out_of_10 = {k: v.score for k, v in response.individual_scores.items()}
+            for parameter, score in individual_scores_out_of_10.items():
+                yield "score", {"parameter": parameter, "score": score}
+            yield "scores", {"final_score": response.final_score, "individual_scores": individual_scores_out_of_10}
+            yield "feedback", {"text": response.feedback}
+            yield "complete", response.model_dump()
+            return
+
+        prompt_budgets: Dict[str, PromptBudget] = {}
+        rating_fallbacks: List[str] = []
+        stages = [
+            stage for stage in self._build_stages(request, lecture, prompt_budgets, rating_fallbacks)
+            if stage.name != "feedback"
+        ]
+        events: asyncio.Queue = asyncio.Queue()
+
+        async def on_stage_complete(name: str, result: Any):
+            if name in ("semantic", "qualitative"):
+                # Normalise this stage's raw scores on their own for display
+                _, normalized = self.scoring_engine.calculate_final_score(result)
+                for parameter, score in normalized.items():
+                    await events.put(("score", {"parameter": parameter, "score": score}))
+
+        pipeline_task = asyncio.create_task(run_pipeline(stages, on_stage_complete=on_stage_complete))
+        pipeline_task.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            pipeline = pipeline_task.result()
+        finally:
+            if not pipeline_task.done():
+                pipeline_task.cancel()
+
+        final_score, individual_scores_out_of_10 = pipeline.results["scoring"]
+        yield "scores", {"final_score": final_score, "individual_scores": individual_scores_out_of_10}
+
+        # 5. Stream human-readable feedback
+        feedback_started = time.perf_counter()
+        feedback_parts = []
+        fallback_stages = self._with_rating_fallbacks(pipeline.fallback_stages, rating_fallbacks)
+        if request.evaluation_mode == EvaluationMode.FAST:
+            feedback_parts.append(self.template_feedback.generate(individual_scores_out_of_10))
+            yield "feedback", {"text": feedback_parts[0]}
+        else:
+            prompt_transcript = await self._prompt_transcript(
+                "feedback", request.student_summary, lecture, pipeline.results["concepts"], prompt_budgets
+            )
+            tokens = self.feedback_generator.stream(
+                individual_scores=individual_scores_out_of_10,
+                summary=request.student_summary,
+                transcript=prompt_transcript
+            ).__aiter__()
+            # The same deadline as the pipeline's feedback stage, over the whole stream
+            timeout = settings.STAGE_TIMEOUTS.get("feedback")
+            deadline = feedback_started + timeout if timeout is not None else None
+            try:
+                while True:
+                    remaining = max(0.0, deadline - time.perf_counter()) if deadline is not None else None
+                    try:
+                        token = await asyncio.wait_for(tokens.__anext__(), timeout=remaining)
+                    except StopAsyncIteration:
+                        break
+                    feedback_parts.append(token)
+                    yield "feedback", {"text": token}
+            except asyncio.TimeoutError:
+                print("Pipeline stage 'feedback' timed out; using fallback.")
+                fallback_stages.append("feedback")
+                FALLBACKS.inc(component="stage:feedback")
+                if not feedback_parts:
+                    feedback_parts.append(FeedbackGenerator.FALLBACK_FEEDBACK)
+                    yield "feedback", {"text": FeedbackGenerator.FALLBACK_FEEDBACK}
+            except Exception:
+                # The stream broke after some text was sent: keep it, but it is incomplete
+                fallback_stages.append("feedback")
+                FALLBACKS.inc(component="stage:feedback")
+            finally:
+                await tokens.aclose()
+        timings_ms = {**pipeline.timings_ms, "feedback": round((time.perf_counter() - feedback_started) * 1000, 2)}
+
+        response = EvaluationResponse(
+            evaluation_id=uuid.uuid4().hex,
+            final_score=final_score,
+            feedback="".join(feedback_parts).strip(),
+            individual_scores={k: IndividualScore(score=v) for k, v in individual_scores_out_of_10.items()},
+            metadata=EvaluationMetadata(
+                stage_timings_ms=timings_ms,
+                fallback_stages=fallback_stages,
+                prompt_budgets=self._budget_metadata(prompt_budgets)
+            )
+        )
+        raw_scores = {**pipeline.results["semantic"], **pipeline.results["qualitative"]}
+        await self._save_scores([self._score_record(response, raw_scores, request.cohort_id)])
+        if not fallback_stages and pipeline.results["concepts"]:
+            self._remember(scope, signature, raw_scores, response.feedback)
+        yield "complete", response.model_dump()
+
+    async def _complete_evaluation(
+        self,
+        summary: str,
+        lecture: LectureArtifacts,
+        key_concepts: List[str],
+        semantic_scores: Dict[str, float],
+        parameters: List[EvaluationParameter],
+        grammar_score: Optional[float] = None,
+        fast: bool = False,
+        fallback_stages: Optional[List[str]] = None
+    ) -> Tuple[EvaluationResponse, Dict[str, float]]:
+        """
+        Runs the per-student stages once the shared semantic scores are known.
+        Returns the response and the raw scores it was built from. Shared
+        stages that fell back are reported in `fallback_stages`.
+        """
+        fallback_stages = list(fallback_stages or [])
+        rating_fallbacks: List[str] = []
+        if fast:
+            qualitative_scores = await self.local_qualitative_analyzer.analyze(
+                summary, lecture.transcript, parameters, grammar_score=grammar_score
+            )
+            all_raw_scores = {**semantic_scores, **qualitative_scores}
+            final_score, individual_scores_out_of_10 = self.scoring_engine.calculate_final_score(all_raw_scores)
+            return EvaluationResponse(
+                evaluation_id=uuid.uuid4().hex,
+                final_score=final_score,
+                feedback=self.template_feedback.generate(individual_scores_out_of_10),
+                individual_scores={k: IndividualScore(score=v) for k, v in individual_scores_out_of_10.items()},
+                metadata=EvaluationMetadata(fallback_stages=fallback_stages)
+            ), all_raw_scores
+
+        prompt_budgets: Dict[str, PromptBudget] = {}
+        prompt_transcript = lecture.transcript
+        if any(p != EvaluationParameter.GRAMMAR for p in parameters):
+            prompt_transcript = await self._prompt_transcript("qualitative", summary, lecture, key_concepts, prompt_budgets)
         qualitative_scores = await self.qualitative_analyzer.analyze(
-            summary=request.student_summary, 
-            transcript=request.lecture_transcript,
-            parameters=request.evaluation_parameters
+            summary=summary,
+            transcript=prompt_transcript,
+            parameters=parameters,
+            grammar_score=grammar_score,
+            fallbacks=rating_fallbacks
         )
-        
-        # Combine all raw scores
+        fallback_stages = self._with_rating_fallbacks(fallback_stages, rating_fallbacks)
         all_raw_scores = {**semantic_scores, **qualitative_scores}
-        
-        # 4. Aggregate scores using the scoring engine
         final_score, individual_scores_out_of_10 = self.scoring_engine.calculate_final_score(all_raw_scores)
-        
-        # 5. Generate human-readable feedback
         feedback = await self.feedback_generator.generate(
-            individual_scores=individual_scores_out_of_10, 
-            summary=request.student_summary,
-            transcript=request.lecture_transcript
+            individual_scores=individual_scores_out_of_10,
+            summary=summary,
+            transcript=await self._prompt_transcript("feedback", summary, lecture, key_concepts, prompt_budgets)
         )
-        
-        # 6. Format the final response
-        response = EvaluationResponse(
+        return EvaluationResponse(
+            evaluation_id=uuid.uuid4().hex,
             final_score=final_score,
             feedback=feedback,
-            individual_scores={k: IndividualScore(score=v) for k, v in individual_scores_out_of_10.items()}
+            individual_scores={k: IndividualScore(score=v) for k, v in individual_scores_out_of_10.items()},
+            metadata=EvaluationMetadata(
+                fallback_stages=fallback_stages,
+                prompt_budgets=self._budget_metadata(prompt_budgets)
+            )
+        ), all_raw_scores
+
+    async def evaluate_many(self, request: BatchEvaluationRequest) -> BatchEvaluationResponse:
+        """
+        Evaluates a cohort of summaries against one transcript. Key concepts are
+        extracted once and all summaries are scored from a single batched encode;
+        a failure for one student is reported without failing the others.
+        """
+        summaries = [s.student_summary for s in request.submissions]
+        lecture = await self.resolve_lecture(request)
+        fast = request.evaluation_mode == EvaluationMode.FAST
+
+        # 1. Extract key concepts once for the whole cohort (precomputed for registered lectures),
+        # with the same timeout and fallback as the single-request pipeline
+        key_concepts = lecture.key_concepts
+        shared_fallbacks: List[str] = []
+        if key_concepts is None:
+            extractor = self.local_concept_extractor if fast else self.concept_extractor
+            try:
+                key_concepts = await asyncio.wait_for(
+                    extractor.extract(lecture.transcript), timeout=settings.STAGE_TIMEOUTS.get("concepts")
+                )
+            except Exception as e:
+                reason = "timed out" if isinstance(e, asyncio.TimeoutError) else f"failed: {e}"
+                print(f"Pipeline stage 'concepts' {reason}; using fallback.")
+                FALLBACKS.inc(component="stage:concepts")
+                key_concepts = []
+                shared_fallbacks.append("concepts")
+
+        # 2. Semantic analysis for every summary from one summaries x concepts matrix
+        semantic_scores = await self.semantic_analyzer.analyze_many(
+            summaries=summaries,
+            transcript=lecture.transcript,
+            key_concepts=key_concepts,
+            transcript_embeddings=lecture.chunk_embeddings,
+            concept_embeddings=lecture.concept_embeddings
         )
-        
-        return response
+
+        # 3. Grammar scores for the whole cohort in one pass
+        grammar_scores: List[Optional[float]] = [None] * len(summaries)
+        if EvaluationParameter.GRAMMAR in request.evaluation_parameters:
+            grammar_scores = [report.score for report in self.qualitative_analyzer.grammar_scorer.score_many(summaries)]
+
+        # 4. Near-duplicates, of a summary evaluated before or of an earlier submission in this batch
+        scope = self._duplicate_scope(request, lecture)
+        lookups = [self._find_duplicate(scope, summary) for summary in summaries]
+        matches = [match for match, _ in lookups]
+        signatures = [signature for _, signature in lookups]
+        batch_leader = self._group_batch_duplicates(matches, signatures)
+
+        # 5. Per-student qualitative analysis, scoring and feedback, once per distinct summary
+        limiter = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+
+        async def evaluate_one(i: int) -> Tuple[EvaluationResponse, Dict[str, float], Optional[DuplicateMatch]]:
+            async with limiter:
+                response, raw_scores = await self._complete_evaluation(
+                    summary=summaries[i],
+                    lecture=lecture,
+                    key_concepts=key_concepts,
+                    semantic_scores=semantic_scores[i],
+                    parameters=request.evaluation_parameters,
+                    grammar_score=grammar_scores[i],
+                    fast=fast,
+                    fallback_stages=shared_fallbacks
+                )
+            entry = None
+            if not response.metadata.fallback_stages and key_concepts:
+                entry = self._remember(scope, signatures[i], raw_scores, response.feedback, request.submissions[i].student_id)
+            return response, raw_scores, entry
+
+        leaders = {
+            i: asyncio.ensure_future(evaluate_one(i))
+            for i in range(len(summaries)) if matches[i] is None and i not in batch_leader
+        }
+
+        async def run_one(i: int) -> Tuple[EvaluationResponse, Dict[str, float]]:
+            started = time.perf_counter()
+            if matches[i] is not None:
+                return self._duplicate_response(matches[i], summaries[i], started)
+            if i in leaders:
+                return (await leaders[i])[:2]
+            leader, similarity = batch_leader[i]
+            try:
+                _, _, entry = await leaders[leader]
+            except Exception:
+                entry = None
+            if entry is None:
+                # The original failed or used fallbacks; evaluate this copy on its own
+                return (await evaluate_one(i))[:2]
+            return self._duplicate_response(replace(entry, similarity=similarity), summaries[i], started)
+
+        outcomes = await asyncio.gather(*(run_one(i) for i in range(len(summaries))), return_exceptions=True)
+
+        results = []
+        records = []
+        for submission, outcome in zip(request.submissions, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"Error evaluating submission {submission.student_id}: {outcome}")
+                results.append(BatchEvaluationItem(student_id=submission.student_id, error=str(outcome)))
+            else:
+                response, raw_scores = outcome
+                records.append(self._score_record(response, raw_scores, request.cohort_id, submission.student_id))
+                results.append(BatchEvaluationItem(student_id=submission.student_id, result=response))
+        # One write for the whole cohort's raw scores
+        if records:
+            await self._save_scores(records)
+
+        succeeded = sum(1 for item in results if item.result is not None)
+        return BatchEvaluationResponse(
+            results=results,
+            succeeded=succeeded,
+            failed=len(results) - succeeded
+        )
+
+    def _group_batch_duplicates(
+        self,
+        matches: List[Optional[DuplicateMatch]],
+        signatures: List[Any]
+    ) -> Dict[int, Tuple[int, float]]:
+        """
+        Maps each submission that nearly duplicates an earlier, unmatched one in
+        the same batch to (index of that submission, similarity).
+        """
+        batch_leader: Dict[int, Tuple[int, float]] = {}
+        if self.duplicate_index is None:
+            return batch_leader
+        candidates = [i for i, (match, signature) in enumerate(zip(matches, signatures)) if match is None and signature is not None]
+        if not candidates:
+            return batch_leader
+        stacked = np.stack([signatures[i] for i in candidates])
+        originals: List[int] = []
+        for position, i in enumerate(candidates):
+            if originals:
+                similarities = (stacked[originals] == stacked[position]).mean(axis=1)
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.duplicate_index.threshold:
+                    batch_leader[i] = (candidates[originals[best]], round(float(similarities[best]), 3))
+                    continue
+            originals.append(position)
+        return batch_leader
+
+    async def rescore(self, request: RescoreRequest) -> RescoreResponse:
+        """
+        Rebuilds final and normalized scores from stored raw scores, optionally
+        with overridden weights, without re-running any evaluation. Raises
+        ValueError if the weights are invalid.
+        """
+        weights = self.scoring_engine.resolve_weights(request.weights)
+        missing: List[str] = []
+        if request.cohort_id is not None:
+            records = await asyncio.to_thread(self.score_store.by_cohort, request.cohort_id)
+        else:
+            records = await asyncio.to_thread(self.score_store.get_many, request.evaluation_ids)
+            found = {record["evaluation_id"] for record in records}
+            missing = [i for i in request.evaluation_ids if i not in found]
+
+        scored = self.scoring_engine.rescore([record["raw_scores"] for record in records], weights)
+        return RescoreResponse(
+            results=[
+                RescoreItem(
+                    evaluation_id=record["evaluation_id"],
+                    cohort_id=record["cohort_id"],
+                    student_id=record["student_id"],
+                    final_score=final_score,
+                    individual_scores={k: IndividualScore(score=v) for k, v in individual_scores_out_of_10.items()}
+                )
+                for record, (final_score, individual_scores_out_of_10) in zip(records, scored)
+            ],
+            weights=weights,
+            missing=missing
+        )
+
+    @property
+    def ready(self) -> bool:
+        return self.semantic_analyzer.ready
+
+    async def warmup(self):
+        """Loads models and initialises kernels ahead of the first request."""
+        await self.semantic_analyzer.warmup()
+
+    async def close(self):
+        """Releases background resources held by the analyzers."""
+        await self.semantic_analyzer.close()
+        self.score_store.close()
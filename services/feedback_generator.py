@@ -1,18 +1,19 @@
 # services/feedback_generator.py
 
-from typing import Dict
+from typing import AsyncIterator, Dict
 from utils.llm_client import LLMClient
+from utils.metrics import FALLBACKS
 
 class FeedbackGenerator:
+    FALLBACK_FEEDBACK = "Feedback could not be generated due to an internal error. Please check the individual scores for details."
+
     def __init__(self, llm_client: LLMClient):
         self.llm_client = llm_client
 
-    async def generate(self, individual_scores: Dict[str, float], summary: str, transcript: str) -> str:
-        """Generates a human-readable feedback text based on the evaluation scores."""
-        
+    def _build_prompt(self, individual_scores: Dict[str, float], summary: str, transcript: str) -> str:
         scores_str = "\n".join([f"- {param.capitalize()}: {score:.1f}/10" for param, score in individual_scores.items()])
 
-        prompt = f"""You are an encouraging and constructive teaching assistant.
+        return f'''You are an encouraging and constructive teaching assistant.
 
 Based on the following evaluation scores for a student's summary of a lecture, provide a concise, helpful feedback paragraph.
 
@@ -28,15 +29,45 @@ And the original transcript:
 """{transcript}"""
 
 Provide the feedback as a single paragraph of text.
-"""
+'''
+
+    async def generate(self, individual_scores: Dict[str, float], summary: str, transcript: str) -> str:
+        """Generates a human-readable feedback text based on the evaluation scores."""
+        prompt = self._build_prompt(individual_scores, summary, transcript)
 
         try:
             feedback_text = await self.llm_client.generate_text(
                 prompt=prompt, 
                 temperature=0.7,
-                max_tokens=250
+                max_tokens=250,
+                caller="feedback"
             )
             return feedback_text.strip()
         except Exception as e:
             print(f"Error generating feedback: {e}")
-            return "Feedback could not be generated due to an internal error. Please check the individual scores for details."
+            FALLBACKS.inc(component="feedback")
+            return self.FALLBACK_FEEDBACK
+
+    async def stream(self, individual_scores: Dict[str, float], summary: str, transcript: str) -> AsyncIterator[str]:
+        """
+        Streams the feedback text as the LLM produces it. If the stream fails
+        before any text, the fallback feedback is yielded; after some text has
+        been sent, the error is re-raised so the caller knows it is cut short.
+        """
+        prompt = self._build_prompt(individual_scores, summary, transcript)
+        produced_text = False
+        try:
+            async for token in self.llm_client.stream_text(
+                prompt=prompt,
+                temperature=0.7,
+                max_tokens=250,
+                caller="feedback"
+            ):
+                produced_text = True
+                yield token
+        except Exception as e:
+            print(f"Error streaming feedback: {e}")
+            if produced_text:
+                raise
+            FALLBACKS.inc(component="feedback")
+            yield self.FALLBACK_FEEDBACK
@@ -0,0 +1,155 @@
+# services/grammar_scorer.py
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+
+# Frequently misspelled English words (lower-case), after Wikipedia's list of
+# common misspellings. Only known-wrong forms are flagged, so technical terms
+# from the lecture are never penalised.
+COMMON_MISSPELLINGS = frozenset("""
+abscence accomodate accomodation acheive acheived acheivement accross adress agressive aquire aquired
+arguement athiest basicly beggining begining beleive beleived belive buisness calender catagory
+cemetary changable collegue comming commited commitee completly concious consious definately definatly
+definetly dependant desparate develope developement diffrent dilema dissapear dissapoint eigth embarass
+enviroment enviromental equiptment existance experiance explaination familar finaly foriegn fourty
+freind fufill goverment grammer gaurd happend harrass heirarchy humourous hygeine ignorence immediatly
+independant indispensible intresting knowlege liase liason libary lisence maintainance managment
+millenium miniscule mischievious mispell neccessary necesary neccessarily noticable occassion
+occassionally occured occurence occurance occuring ommision oppurtunity orignal paralell parliment
+particularily pavillion peice perseverence persistant personell posession possesion potatos
+prefered presance privelege probaly proffesional pronounciation publically questionaire recieve
+recieved reccomend recomend refered referance relevent religous remeber repitition resistence
+responsability rythm seperate seperately sieze similiar sincerly speach succesful sucessful
+supercede suprise surpise tendancy therefor threshhold tommorow tommorrow tounge truely twelth
+tyrany underate untill usefull vaccuum vegtable wierd wich withold writting
+""".split())
+
+# Issue weights: how many "points" one occurrence costs (see GrammarScorer._score_from_counts)
+ISSUE_WEIGHTS: Dict[str, float] = {
+    "spelling": 1.0,
+    "repeated_word": 1.0,
+    "sentence_case": 0.75,
+    "lowercase_i": 0.75,
+    "article": 0.75,
+    "word_confusion": 1.0,
+    "punctuation_spacing": 0.5,
+    "repeated_punctuation": 0.5,
+    "unbalanced_brackets": 0.5,
+    "run_on_sentence": 1.0,
+}
+ISSUE_TYPES = list(ISSUE_WEIGHTS)
+
+# Precompiled once at import; every pattern counts one issue per match
+_WORD = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+# Abbreviations whose periods don't end a sentence: dotted initialisms
+# ("e.g.", "i.e.", "U.S.", "p.m.") and common short forms
+_ABBREVIATION = re.compile(r"\b(?:[A-Za-z]\.){2,}|\b(?:etc|vs|cf|al|approx|fig|dr|mr|mrs|ms|prof|st)\.", re.IGNORECASE)
+_REPEATED_WORD = re.compile(r"\b([A-Za-z]+)\s+\1\b", re.IGNORECASE)
+_SENTENCE_CASE = re.compile(r"(?:^\s*|[.!?]\s+)[a-z]")
+_LOWERCASE_I = re.compile(r"(?<![\w.'])i(?![\w.'])")
+# Only lower-case words: acronyms go by their letter names ("an MRI", "a URL")
+_A_BEFORE_VOWEL = re.compile(r"\b[Aa]\s+([aeiou][a-z]*)\b")
+_AN_BEFORE_CONSONANT = re.compile(r"\b[Aa]n\s+([b-df-hj-np-tv-z][a-z]*)\b")
+_WORD_CONFUSION = re.compile(
+    r"\b(?:(?:could|should|would|must|might) of"
+    r"|alot"
+    r"|(?:more|less|better|worse|rather|other|greater|fewer) then"
+    r"|it's own|your welcome|irregardless)\b",
+    re.IGNORECASE
+)
+_SPACE_BEFORE_PUNCTUATION = re.compile(r"\w\s+[,.;:!?](?!\w)")
+_MISSING_SPACE_AFTER_PUNCTUATION = re.compile(r"[a-z][,;:](?=[A-Za-z])|[a-z]{2}[.!?](?=[A-Z][a-z])")
+_REPEATED_PUNCTUATION = re.compile(r"([,;:])\1+|[!?]{2,}|(?<!\.)\.\.(?!\.)")
+
+# 'a' / 'an' go by sound, not spelling; the usual exceptions
+_A_EXCEPTIONS = ("uni", "use", "usu", "uti", "eu", "one", "once", "ure", "uro")
+_AN_EXCEPTIONS = ("hour", "honest", "honor", "honour", "heir", "herb")
+
+RUN_ON_SENTENCE_WORDS = 45
+# Issue rates are taken over at least this many words, so a single slip in
+# a one-line answer is not scored like ten slips in a paragraph
+MIN_RATE_WORDS = 50
+
+@dataclass
+class GrammarReport:
+    """Per-issue counts for one text and the resulting 1-5 score."""
+    score: float
+    word_count: int
+    issue_counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total_issues(self) -> int:
+        return sum(self.issue_counts.values())
+
+class GrammarScorer:
+    """
+    A local, rule-based grammar and mechanics checker: precompiled regex rules
+    plus a misspelling wordlist. Scores are 1-5 like the LLM-rated qualities,
+    so ScoringEngine normalises them the same way.
+    """
+
+    def __init__(self, issues_per_point: float = 2.0, misspellings: frozenset = COMMON_MISSPELLINGS):
+        # Weighted issues per 100 words that cost one point off the top score of 5
+        self.issues_per_point = issues_per_point
+        self.misspellings = misspellings
+        self._weights = np.array([ISSUE_WEIGHTS[issue] for issue in ISSUE_TYPES], dtype=np.float64)
+
+    @staticmethod
+    def _article_checkable(word: str, exceptions: tuple) -> bool:
+        # Single letters are read by name ("an x-ray", "a u-turn")
+        return len(word) > 1 and not word.startswith(exceptions)
+
+    def count_issues(self, text: str) -> Dict[str, int]:
+        """Counts each kind of issue in the text."""
+        words = _WORD.findall(text)
+        # Sentence rules run on a copy without abbreviation periods
+        unabbreviated = _ABBREVIATION.sub(lambda m: m.group(0).replace(".", ""), text)
+        sentences = [s for s in _SENTENCE_SPLIT.split(unabbreviated.strip()) if s]
+        return {
+            "spelling": sum(1 for word in words if word.lower() in self.misspellings),
+            "repeated_word": sum(
+                1 for m in _REPEATED_WORD.finditer(text)
+                if m.group(1).lower() not in ("had", "that") # "had had", "that that" are grammatical
+            ),
+            "sentence_case": len(_SENTENCE_CASE.findall(unabbreviated)),
+            "lowercase_i": len(_LOWERCASE_I.findall(text)),
+            "article": (
+                sum(1 for m in _A_BEFORE_VOWEL.finditer(text) if self._article_checkable(m.group(1), _A_EXCEPTIONS))
+                + sum(1 for m in _AN_BEFORE_CONSONANT.finditer(text) if self._article_checkable(m.group(1), _AN_EXCEPTIONS))
+            ),
+            "word_confusion": len(_WORD_CONFUSION.findall(text)),
+            "punctuation_spacing": (
+                len(_SPACE_BEFORE_PUNCTUATION.findall(text)) + len(_MISSING_SPACE_AFTER_PUNCTUATION.findall(text))
+            ),
+            "repeated_punctuation": len(_REPEATED_PUNCTUATION.findall(text)),
+            "unbalanced_brackets": abs(text.count("(") - text.count(")")) + text.count('"') % 2,
+            "run_on_sentence": sum(1 for s in sentences if len(s.split()) > RUN_ON_SENTENCE_WORDS),
+        }
+
+    def _score_from_counts(self, counts: np.ndarray, word_counts: np.ndarray) -> np.ndarray:
+        """Vectorised scoring: weighted issues per 100 words, mapped onto 1-5."""
+        weighted = counts @ self._weights
+        per_100_words = weighted * 100.0 / np.maximum(word_counts, MIN_RATE_WORDS)
+        scores = np.clip(5.0 - per_100_words / self.issues_per_point, 1.0, 5.0)
+        # Nothing to judge in an empty text
+        return np.where(word_counts > 0, np.round(scores, 2), 1.0)
+
+    def score_many(self, texts: List[str]) -> List[GrammarReport]:
+        """Checks a batch of texts; the scores are computed in one numpy pass."""
+        if not texts:
+            return []
+        issue_counts = [self.count_issues(text) for text in texts]
+        word_counts = np.array([len(_WORD.findall(text)) for text in texts], dtype=np.float64)
+        counts = np.array([[c[issue] for issue in ISSUE_TYPES] for c in issue_counts], dtype=np.float64)
+        scores = self._score_from_counts(counts, word_counts)
+        return [
+            GrammarReport(score=float(score), word_count=int(words), issue_counts=c)
+            for score, words, c in zip(scores, word_counts, issue_counts)
+        ]
+
+    def score(self, text: str) -> GrammarReport:
+        return self.score_many([text])[0]
@@ -0,0 +1,91 @@
+# services/job_queue.py
+
+import asyncio
+import uuid
+from typing import Any, Dict, List, Optional
+
+from schemas import EvaluationRequest
+from utils.job_store import JobStore
+from .evaluation_orchestrator import EvaluationOrchestrator
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+    def __init__(self, queue_depth: int, max_queue_size: int):
+        super().__init__(f"Evaluation queue is full ({queue_depth}/{max_queue_size} jobs waiting).")
+        self.queue_depth = queue_depth
+        self.max_queue_size = max_queue_size
+
+class EvaluationJobQueue:
+    """
+    A bounded in-process queue of evaluation jobs drained by a fixed pool of
+    workers. Submissions beyond `max_queue_size` are rejected rather than
+    buffered, so callers get backpressure instead of timeouts. Store calls
+    may block on disk, so they run in a worker thread.
+    """
+
+    def __init__(self, orchestrator: EvaluationOrchestrator, store: JobStore, max_queue_size: int = 1000, num_workers: int = 4):
+        self.orchestrator = orchestrator
+        self.store = store
+        self.max_queue_size = max_queue_size
+        self.num_workers = num_workers
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._workers: List[asyncio.Task] = []
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    async def start(self):
+        """Starts the workers and re-queues jobs left unfinished by a previous run."""
+        for job in await asyncio.to_thread(self.store.unfinished):
+            try:
+                self._queue.put_nowait((job["job_id"], EvaluationRequest(**job["request"])))
+                await asyncio.to_thread(self.store.update, job["job_id"], "queued")
+            except asyncio.QueueFull:
+                await asyncio.to_thread(
+                    self.store.update, job["job_id"], "failed",
+                    error="Job could not be resumed after a restart: queue is full."
+                )
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.num_workers)]
+
+    async def stop(self):
+        """Stops the workers and closes the job store."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self.store.close()
+
+    async def submit(self, request: EvaluationRequest) -> str:
+        """Queues an evaluation and returns its job id, or raises QueueFullError."""
+        if self._queue.full():
+            raise QueueFullError(self.depth, self.max_queue_size)
+        job_id = uuid.uuid4().hex
+        await asyncio.to_thread(self.store.create, job_id, request.model_dump(mode="json"))
+        try:
+            self._queue.put_nowait((job_id, request))
+        except asyncio.QueueFull:
+            # Filled up while the job was being recorded
+            await asyncio.to_thread(self.store.update, job_id, "failed", error="Evaluation queue is full.")
+            raise QueueFullError(self.depth, self.max_queue_size)
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def _work(self):
+        while True:
+            job_id, request = await self._queue.get()
+            try:
+                await asyncio.to_thread(self.store.update, job_id, "running")
+                result = await self.orchestrator.evaluate(request)
+                await asyncio.to_thread(self.store.update, job_id, "completed", result=result.model_dump(mode="json"))
+            except asyncio.CancelledError:
+                # Leave the job 'running' so a persistent store resumes it on restart
+                raise
+            except Exception as e:
+                print(f"Error processing evaluation job {job_id}: {e}")
+                await asyncio.to_thread(self.store.update, job_id, "failed", error=str(e))
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,200 @@
+# services/lecture_registry.py
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import settings
+from .concept_extractor import ConceptExtractor
+from .semantic_analyzer import SemanticAnalyzer
+
+class LectureNotFoundError(Exception):
+    """Raised when a lecture_id has not been ingested (or its artifacts are stale)."""
+
+@dataclass
+class LectureArtifacts:
+    """
+    Everything the pipeline needs about one lecture. For registered lectures
+    the embeddings are read-only memory maps, so every worker process shares
+    the same pages through the OS page cache.
+    """
+    transcript: str
+    lecture_id: Optional[str] = None
+    key_concepts: Optional[List[str]] = None
+    chunk_embeddings: Optional[np.ndarray] = None
+    concept_embeddings: Optional[np.ndarray] = None
+    created_at: Optional[float] = None
+
+class LectureRegistry:
+    """
+    Ingests a transcript once — extracting key concepts and embedding its
+    chunks and concepts — and persists the results under `root_dir`:
+
+        <root_dir>/<lecture_id>/meta.json
+        <root_dir>/<lecture_id>/transcript.txt
+        <root_dir>/<lecture_id>/chunks.npy
+        <root_dir>/<lecture_id>/concepts.npy
+
+    <lecture_id> is a symlink to a versioned directory, so replacing a
+    lecture's artifacts is a single atomic rename. Up to `max_loaded`
+    lectures stay loaded in memory; file reads run in a worker thread.
+    """
+
+    def __init__(
+        self,
+        root_dir: str,
+        concept_extractor: ConceptExtractor,
+        semantic_analyzer: SemanticAnalyzer,
+        max_loaded: int = 128
+    ):
+        self.root_dir = root_dir
+        self.concept_extractor = concept_extractor
+        self.semantic_analyzer = semantic_analyzer
+        self.max_loaded = max_loaded
+        self._loaded: "OrderedDict[str, LectureArtifacts]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Striped so concurrent ingests of one lecture are serialised without a lock per id
+        self._ingest_locks = [asyncio.Lock() for _ in range(64)]
+
+    @staticmethod
+    def lecture_id_for(transcript: str) -> str:
+        """Lectures are content-addressed, so ingesting the same transcript twice is idempotent."""
+        return hashlib.sha256(transcript.encode("utf-8")).hexdigest()[:32]
+
+    def _embedding_signature(self) -> Dict[str, object]:
+        # Artifacts are only valid for the model and chunking they were built with
+        return {
+            "model": f"{settings.EMBEDDING_MODEL_NAME}:{self.semantic_analyzer.vector_source()}",
+            "chunking_enabled": settings.TRANSCRIPT_CHUNKING_ENABLED,
+            "chunk_words": settings.TRANSCRIPT_CHUNK_WORDS,
+            "chunk_overlap_words": settings.TRANSCRIPT_CHUNK_OVERLAP_WORDS
+        }
+
+    def _lecture_dir(self, lecture_id: str) -> str:
+        return os.path.join(self.root_dir, lecture_id)
+
+    def _ingest_lock(self, lecture_id: str) -> asyncio.Lock:
+        return self._ingest_locks[hash(lecture_id) % len(self._ingest_locks)]
+
+    async def ingest(self, transcript: str) -> LectureArtifacts:
+        """Extracts concepts, embeds the lecture and persists the artifacts."""
+        lecture_id = self.lecture_id_for(transcript)
+        async with self._ingest_lock(lecture_id):
+            try:
+                return await self.get(lecture_id)
+            except LectureNotFoundError:
+                pass
+
+            key_concepts = await self.concept_extractor.extract(transcript)
+            if not key_concepts:
+                # Don't persist a lecture every evaluation would score zero against
+                raise ValueError("No key concepts could be extracted from the transcript.")
+            chunk_embeddings, concept_embeddings = await self.semantic_analyzer.embed_lecture(transcript, key_concepts)
+            meta = {
+                "lecture_id": lecture_id,
+                "key_concepts": key_concepts,
+                "num_chunks": int(chunk_embeddings.shape[0]),
+                "created_at": time.time(),
+                "embedding": self._embedding_signature()
+            }
+            await asyncio.to_thread(self._write_artifacts, lecture_id, transcript, meta, chunk_embeddings, concept_embeddings)
+
+            with self._lock:
+                self._loaded.pop(lecture_id, None)
+            return await self.get(lecture_id)
+
+    def _write_artifacts(
+        self,
+        lecture_id: str,
+        transcript: str,
+        meta: Dict[str, object],
+        chunk_embeddings: np.ndarray,
+        concept_embeddings: np.ndarray
+    ):
+        # Build the artifacts in a fresh versioned directory, then publish it,
+        # so readers never see a half-written lecture
+        os.makedirs(self.root_dir, exist_ok=True)
+        version_dir = tempfile.mkdtemp(prefix=f".{lecture_id}.", dir=self.root_dir)
+        try:
+            with open(os.path.join(version_dir, "transcript.txt"), "w", encoding="utf-8") as f:
+                f.write(transcript)
+            np.save(os.path.join(version_dir, "chunks.npy"), np.ascontiguousarray(chunk_embeddings, dtype=np.float32))
+            np.save(os.path.join(version_dir, "concepts.npy"), np.ascontiguousarray(concept_embeddings, dtype=np.float32))
+            with open(os.path.join(version_dir, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            self._publish(lecture_id, version_dir)
+        except Exception:
+            shutil.rmtree(version_dir, ignore_errors=True)
+            raise
+
+    def _publish(self, lecture_id: str, version_dir: str):
+        """Points <lecture_id> at `version_dir` atomically and removes the version it replaces."""
+        target = self._lecture_dir(lecture_id)
+        previous = None
+        if os.path.islink(target):
+            previous = os.path.realpath(target)
+        elif os.path.isdir(target):
+            # A plain directory can't be replaced by a rename; move it aside first
+            previous = f"{version_dir}.previous"
+            os.rename(target, previous)
+        link = f"{version_dir}.link"
+        os.symlink(os.path.basename(version_dir), link)
+        os.replace(link, target)
+        if previous is not None and previous != os.path.realpath(version_dir):
+            # Memory maps other requests still hold on the old files stay valid
+            shutil.rmtree(previous, ignore_errors=True)
+
+    async def get(self, lecture_id: str) -> LectureArtifacts:
+        """Returns a registered lecture, loading it off the event loop if it isn't loaded yet."""
+        with self._lock:
+            cached = self._loaded.get(lecture_id)
+            if cached is not None:
+                self._loaded.move_to_end(lecture_id)
+                return cached
+
+        artifacts = await asyncio.to_thread(self._load, lecture_id)
+        with self._lock:
+            self._loaded[lecture_id] = artifacts
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+        return artifacts
+
+    def _load(self, lecture_id: str) -> LectureArtifacts:
+        """Reads a lecture's metadata and transcript and memory-maps its embeddings."""
+        lecture_dir = self._lecture_dir(lecture_id)
+        # Guard against ids that would escape the registry directory
+        if os.path.dirname(os.path.abspath(lecture_dir)) != os.path.abspath(self.root_dir):
+            raise LectureNotFoundError(f"Lecture '{lecture_id}' is not registered.")
+        # Read every file from one version, even if the lecture is re-published meanwhile
+        version_dir = os.path.realpath(lecture_dir)
+        meta_path = os.path.join(version_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            raise LectureNotFoundError(f"Lecture '{lecture_id}' is not registered.")
+
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("embedding") != self._embedding_signature():
+            raise LectureNotFoundError(
+                f"Lecture '{lecture_id}' was built with different embedding settings; re-ingest it."
+            )
+        with open(os.path.join(version_dir, "transcript.txt"), encoding="utf-8") as f:
+            transcript = f.read()
+
+        return LectureArtifacts(
+            transcript=transcript,
+            lecture_id=lecture_id,
+            key_concepts=meta["key_concepts"],
+            chunk_embeddings=np.load(os.path.join(version_dir, "chunks.npy"), mmap_mode="r"),
+            concept_embeddings=np.load(os.path.join(version_dir, "concepts.npy"), mmap_mode="r"),
+            created_at=meta["created_at"]
+        )
@@ -0,0 +1,81 @@
+# services/local_concept_extractor.py
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import List
+
+import numpy as np
+
+from .semantic_analyzer import SemanticAnalyzer
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text.strip()) if s.strip()]
+
+class LocalConceptExtractor:
+    """
+    Picks key concepts without an LLM: the transcript's most central sentences
+    by embedding similarity to the whole lecture, chosen with maximal marginal
+    relevance so they don't all say the same thing.
+    """
+
+    def __init__(
+        self,
+        semantic_analyzer: SemanticAnalyzer,
+        num_concepts: int = 8,
+        max_sentences: int = 256,
+        diversity: float = 0.3,
+        cache_size: int = 256
+    ):
+        self.semantic_analyzer = semantic_analyzer
+        self.num_concepts = num_concepts
+        self.max_sentences = max_sentences
+        self.diversity = diversity
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _candidate_sentences(self, transcript: str) -> List[str]:
+        sentences = split_sentences(transcript)
+        # Very short or run-on sentences make poor concepts when there is a choice
+        candidates = [s for s in sentences if 6 <= len(s.split()) <= 60] or sentences
+        if len(candidates) > self.max_sentences:
+            # Sample evenly so every part of the lecture is represented
+            indices = np.linspace(0, len(candidates) - 1, self.max_sentences).round().astype(int)
+            candidates = [candidates[i] for i in indices]
+        return candidates
+
+    async def extract(self, transcript: str) -> List[str]:
+        """Extracts key concepts from a lecture transcript using sentence embeddings."""
+        key = hashlib.sha256(transcript.encode("utf-8")).hexdigest()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        sentences = self._candidate_sentences(transcript)
+        if not sentences:
+            return []
+        embeddings = await self.semantic_analyzer.embed(sentences)
+        embeddings = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        similarities = embeddings @ embeddings.T
+        # Centrality: mean similarity of each sentence to the whole lecture
+        centrality = similarities.mean(axis=1)
+
+        selected: List[int] = []
+        for _ in range(min(self.num_concepts, len(sentences))):
+            redundancy = similarities[:, selected].max(axis=1) if selected else np.zeros(len(sentences))
+            scores = (1 - self.diversity) * centrality - self.diversity * redundancy
+            scores[selected] = -np.inf
+            selected.append(int(np.argmax(scores)))
+        key_concepts = [sentences[i] for i in sorted(selected)]
+
+        with self._lock:
+            self._cache[key] = key_concepts
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return key_concepts
@@ -0,0 +1,99 @@
+# services/local_qualitative_analyzer.py
+
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from schemas import EvaluationParameter
+from .grammar_scorer import GrammarScorer
+from .local_concept_extractor import split_sentences
+from .semantic_analyzer import SemanticAnalyzer
+
+_WORD = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?")
+CONNECTIVES = frozenset("""
+however therefore thus hence because since although while whereas consequently furthermore moreover
+additionally also first second third finally then next similarly instead meanwhile overall so
+""".split())
+FILLER_WORDS = frozenset("very really basically actually just quite literally totally stuff things thing".split())
+_FILLER_PHRASES = re.compile(
+    r"\b(?:in order to|due to the fact that|at this point in time|it is important to note that"
+    r"|the fact that|as a matter of fact|a lot of|kind of|sort of)\b",
+    re.IGNORECASE
+)
+
+def _clip(score: float) -> float:
+    return round(float(min(5.0, max(1.0, score))), 2)
+
+class LocalQualitativeAnalyzer:
+    """
+    Rates clarity, coherence and conciseness (1-5) from cheap text features
+    and sentence-embedding heuristics instead of the LLM. Grammar uses the
+    same local GrammarScorer as the full pipeline.
+    """
+
+    def __init__(self, semantic_analyzer: SemanticAnalyzer, grammar_scorer: GrammarScorer):
+        self.semantic_analyzer = semantic_analyzer
+        self.grammar_scorer = grammar_scorer
+
+    @staticmethod
+    def _clarity(sentences: List[str], words: List[str]) -> float:
+        # Sentences of roughly 8-22 words and few very long words read most easily
+        mean_length = len(words) / max(1, len(sentences))
+        penalty = max(0.0, (mean_length - 22) / 8) + max(0.0, (8 - mean_length) / 4)
+        long_word_ratio = sum(1 for w in words if len(w) > 12) / max(1, len(words))
+        penalty += max(0.0, long_word_ratio - 0.08) * 20
+        return _clip(5.0 - penalty)
+
+    @staticmethod
+    def _coherence(sentences: List[str], similarities: Optional[np.ndarray]) -> float:
+        if similarities is None or len(sentences) < 2:
+            return 3.5 # A single sentence has no flow to judge
+        # Consecutive sentences that stay on topic, plus explicit linking words
+        adjacent = float(np.mean(np.diagonal(similarities, offset=1)))
+        score = 1.0 + 4.0 * min(1.0, max(0.0, (adjacent - 0.15) / 0.45))
+        linked = sum(1 for s in sentences[1:] if CONNECTIVES.intersection(w.lower() for w in _WORD.findall(s)))
+        return _clip(score + min(0.5, linked / (len(sentences) - 1)))
+
+    @staticmethod
+    def _conciseness(summary: str, sentences: List[str], words: List[str], similarities: Optional[np.ndarray], transcript_words: int) -> float:
+        filler = sum(1 for w in words if w.lower() in FILLER_WORDS) + 2 * len(_FILLER_PHRASES.findall(summary))
+        penalty = filler / max(1, len(words)) * 25
+        if similarities is not None and len(sentences) > 1:
+            # Near-identical sentences are repetition
+            off_diagonal = similarities[~np.eye(len(sentences), dtype=bool)]
+            penalty += max(0.0, (float(off_diagonal.max()) - 0.85) / 0.15) * 1.5
+        if transcript_words:
+            # A summary approaching the lecture's own length isn't summarising
+            penalty += max(0.0, len(words) / transcript_words - 0.4) * 5
+        return _clip(5.0 - penalty)
+
+    async def analyze(
+        self,
+        summary: str,
+        transcript: str,
+        parameters: List[EvaluationParameter],
+        grammar_score: Optional[float] = None
+    ) -> Dict[str, float]:
+        """Analyzes the summary for qualitative aspects with local features only."""
+        requested = [param.value for param in parameters]
+        sentences = split_sentences(summary)
+        words = _WORD.findall(summary)
+
+        similarities = None
+        if len(sentences) > 1 and ('coherence' in requested or 'conciseness' in requested):
+            embeddings = await self.semantic_analyzer.embed(sentences)
+            embeddings = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+            similarities = embeddings @ embeddings.T
+
+        scores = {}
+        for param in requested:
+            if param == 'clarity':
+                scores[param] = self._clarity(sentences, words)
+            elif param == 'coherence':
+                scores[param] = self._coherence(sentences, similarities)
+            elif param == 'conciseness':
+                scores[param] = self._conciseness(summary, sentences, words, similarities, len(transcript.split()))
+            elif param == 'grammar':
+                scores[param] = grammar_score if grammar_score is not None else self.grammar_scorer.score(summary).score
+        return scores
@@ -0,0 +1,84 @@
+# services/pipeline.py
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from utils.metrics import FALLBACKS, STAGE_DURATION
+
+@dataclass
+class Stage:
+    """
+    One step of the evaluation pipeline. `run` receives the results of the
+    stages it depends on. If it raises or exceeds `timeout` seconds, the
+    `fallback` (if any) supplies the stage's result instead.
+    """
+    name: str
+    run: Callable[[Dict[str, Any]], Awaitable[Any]]
+    depends_on: List[str] = field(default_factory=list)
+    timeout: Optional[float] = None
+    fallback: Optional[Callable[[Dict[str, Any]], Any]] = None
+
+@dataclass
+class PipelineResult:
+    results: Dict[str, Any]
+    timings_ms: Dict[str, float]
+    fallback_stages: List[str]
+
+async def run_pipeline(
+    stages: List[Stage],
+    on_stage_complete: Optional[Callable[[str, Any], Awaitable[None]]] = None
+) -> PipelineResult:
+    """
+    Runs stages as a dependency graph: each stage starts as soon as all of its
+    dependencies have finished, so independent stages run concurrently.
+    """
+    # Dependencies must be declared before the stages that use them
+    declared = set()
+    for stage in stages:
+        for dep in stage.depends_on:
+            if dep not in declared:
+                raise ValueError(f"Stage '{stage.name}' depends on undeclared stage '{dep}'.")
+        declared.add(stage.name)
+
+    results: Dict[str, Any] = {}
+    timings_ms: Dict[str, float] = {}
+    fallback_stages: List[str] = []
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def execute(stage: Stage) -> Any:
+        if stage.depends_on:
+            await asyncio.gather(*(tasks[dep] for dep in stage.depends_on))
+        inputs = {dep: results[dep] for dep in stage.depends_on}
+
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(stage.run(inputs), timeout=stage.timeout)
+        except Exception as e:
+            if stage.fallback is None:
+                raise
+            reason = "timed out" if isinstance(e, asyncio.TimeoutError) else f"failed: {e}"
+            print(f"Pipeline stage '{stage.name}' {reason}; using fallback.")
+            result = stage.fallback(inputs)
+            fallback_stages.append(stage.name)
+            FALLBACKS.inc(component=f"stage:{stage.name}")
+        elapsed = time.perf_counter() - started
+        timings_ms[stage.name] = round(elapsed * 1000, 2)
+        STAGE_DURATION.observe(elapsed, stage=stage.name)
+
+        results[stage.name] = result
+        if on_stage_complete is not None:
+            await on_stage_complete(stage.name, result)
+        return result
+
+    for stage in stages:
+        tasks[stage.name] = asyncio.create_task(execute(stage))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    finally:
+        for task in tasks.values():
+            if not task.done():
+                task.cancel()
+
+    return PipelineResult(results=results, timings_ms=timings_ms, fallback_stages=fallback_stages)
@@ -0,0 +1,120 @@
+# services/prompt_budget.py
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import settings
+from .semantic_analyzer import SemanticAnalyzer, chunk_text
+
+PASSAGE_SEPARATOR = "\n[...]\n"
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """The tiktoken encoding for the configured model, or None if tiktoken isn't installed."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(settings.LLM_MODEL_NAME)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+def count_tokens(text: str) -> int:
+    """Counts tokens with tiktoken when available, else estimates ~4 characters per token."""
+    encoding = _encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+@dataclass
+class PromptBudget:
+    """How a transcript was fitted into one call type's prompt."""
+    call_type: str
+    budget_tokens: Optional[int]
+    transcript_tokens: int
+    prompt_transcript_tokens: int
+    passages_used: int
+    passages_total: int
+
+    @property
+    def compressed(self) -> bool:
+        return self.passages_used < self.passages_total
+
+class PromptBudgetManager:
+    """
+    Fits the transcript into a per-call-type token budget. When the whole
+    transcript is over budget, it keeps the passages most similar to the
+    summary and key concepts (by embedding similarity), in lecture order.
+    """
+
+    def __init__(self, semantic_analyzer: SemanticAnalyzer, budgets: Dict[str, int]):
+        self.semantic_analyzer = semantic_analyzer
+        self.budgets = budgets
+
+    async def fit_transcript(
+        self,
+        call_type: str,
+        transcript: str,
+        summary: str,
+        key_concepts: Optional[List[str]] = None,
+        chunk_embeddings: Optional[np.ndarray] = None
+    ) -> Tuple[str, PromptBudget]:
+        """Returns the transcript text to put in the prompt and a report of the budget used."""
+        budget = self.budgets.get(call_type)
+        # A token is at least one character, so short transcripts need no counting
+        if not budget or len(transcript) <= budget:
+            tokens = count_tokens(transcript)
+            return transcript, PromptBudget(call_type, budget, tokens, tokens, 1, 1)
+        transcript_tokens = count_tokens(transcript)
+        if transcript_tokens <= budget:
+            return transcript, PromptBudget(call_type, budget, transcript_tokens, transcript_tokens, 1, 1)
+
+        window, overlap = settings.TRANSCRIPT_CHUNK_WORDS, settings.TRANSCRIPT_CHUNK_OVERLAP_WORDS
+        passages = chunk_text(transcript, window, overlap)
+        # Registered lectures' chunk embeddings match these passages when chunking is on
+        if not settings.TRANSCRIPT_CHUNKING_ENABLED or chunk_embeddings is None or chunk_embeddings.shape[0] != len(passages):
+            chunk_embeddings = None
+        similarities = await self.semantic_analyzer.similarities(
+            [summary, *(key_concepts or [])], passages, passage_embeddings=chunk_embeddings
+        )
+        # Equal weight to matching the summary and to the best-matching key concept
+        relevance = similarities[0] if similarities.shape[0] == 1 else 0.5 * similarities[0] + 0.5 * similarities[1:].max(axis=0)
+
+        # Greedily take the most relevant passages that fit. Each is charged in
+        # full (plus a separator), so overlaps only ever leave spare room.
+        separator_tokens = count_tokens(PASSAGE_SEPARATOR)
+        selected, used = [], 0
+        for index in np.argsort(-relevance, kind="stable"):
+            if budget - used <= separator_tokens:
+                break
+            cost = count_tokens(passages[index]) + separator_tokens
+            if used + cost <= budget:
+                selected.append(int(index))
+                used += cost
+
+        words = transcript.split()
+        step = max(1, window - overlap)
+        if selected:
+            text = self._join_passages(words, sorted(selected), step, window)
+        else:
+            # Budget smaller than one passage: the start of the best one, ~0.75 words per token
+            best = int(np.argmax(relevance))
+            text = " ".join(words[best * step:best * step + window][:max(1, int(budget * 0.75))])
+            selected = [best]
+        return text, PromptBudget(call_type, budget, transcript_tokens, count_tokens(text), len(selected), len(passages))
+
+    @staticmethod
+    def _join_passages(words: List[str], indices: List[int], step: int, window: int) -> str:
+        """Rebuilds the selected passages in order, merging overlapping or adjacent ones."""
+        ranges: List[List[int]] = []
+        for index in indices:
+            start, end = index * step, min(index * step + window, len(words))
+            if ranges and start <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], end)
+            else:
+                ranges.append([start, end])
+        return PASSAGE_SEPARATOR.join(" ".join(words[start:end]) for start, end in ranges)
@@ -1,24 +1,56 @@
 # services/qualitative_analyzer.py
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 import json
 import asyncio
 from schemas import EvaluationParameter
 from utils.llm_client import LLMClient
+from config import settings
+from utils.metrics import FALLBACKS
+from .grammar_scorer import GrammarScorer
 
 class QualitativeAnalyzer:
+    PROMPT_MAP = {
+        'clarity': "How clear and easy to understand is the student's summary?",
+        'coherence': "Does the summary flow logically and connect ideas smoothly?",
+        'conciseness': "Does the summary capture the main points without unnecessary words or repetition?"
+    }
+
     def __init__(self, llm_client: LLMClient):
         self.llm_client = llm_client
+        self.grammar_scorer = GrammarScorer()
+
+    @staticmethod
+    def _parse_rating(response_text: str) -> float:
+        # Clean and parse JSON
+        cleaned_response = response_text.strip().replace('`json', '').replace('`', '')
+        data = json.loads(cleaned_response)
+        score = float(data.get('score', 0.0))
+        # Clamp score between 1 and 5
+        return max(1.0, min(5.0, score))
+
+    @classmethod
+    def _is_valid_rating(cls, response_text: str) -> bool:
+        try:
+            cls._parse_rating(response_text)
+            return True
+        except (json.JSONDecodeError, ValueError, TypeError, AttributeError):
+            return False
 
-    async def _get_llm_rating(self, parameter: str, summary: str, transcript: str) -> float:
-        """Gets a single qualitative rating from the LLM."""
-        prompt_map = {
-            'clarity': "How clear and easy to understand is the student's summary?",
-            'coherence': "Does the summary flow logically and connect ideas smoothly?",
-            'conciseness': "Does the summary capture the main points without unnecessary words or repetition?"
-        }
+    async def _get_llm_rating(
+        self,
+        parameter: str,
+        summary: str,
+        transcript: str,
+        fallbacks: Optional[List[str]] = None
+    ) -> float:
+        """
+        Gets a single qualitative rating from the LLM. If the reply can't be
+        parsed, the parameter is appended to `fallbacks` and a neutral score returned.
+        """
+        prompt_map = self.PROMPT_MAP
 
-        prompt = f"""You are an expert evaluator. Analyze the student's summary in the context of the original lecture transcript.
+        prompt = f'''You are an expert evaluator. Analyze the student's summary in the context of the original lecture transcript.
 
 Original Transcript:
 """{transcript}"""
@@ -32,61 +64,146 @@ Rate the summary on a scale from 1 (very poor) to 5 (excellent) for the specific
 
 Respond with ONLY a JSON object containing a single key 'score' with your numeric rating.
 Example: {{"score": 4.5}}
-"""
+'''
 
         try:
             response_text = await self.llm_client.generate_text(
                 prompt=prompt, 
                 temperature=0.1, 
-                max_tokens=50
+                max_tokens=50,
+                caller="qualitative",
+                validate=self._is_valid_rating
             )
-            # Clean and parse JSON
-            cleaned_response = response_text.strip().replace('`json', '').replace('`', '')
-            data = json.loads(cleaned_response)
-            score = float(data.get('score', 0.0))
-            # Clamp score between 1 and 5
-            return max(1.0, min(5.0, score))
-        except (json.JSONDecodeError, ValueError, TypeError) as e:
+            return self._parse_rating(response_text)
+        except (json.JSONDecodeError, ValueError, TypeError, AttributeError) as e:
             print(f"Error getting LLM rating for {parameter}: {e}")
+            FALLBACKS.inc(component="qualitative_rating")
+            if fallbacks is not None:
+                fallbacks.append(parameter)
             return 2.5 # Return a neutral score on failure
 
+    @staticmethod
+    def _parse_combined_scores(response_text: str, parameters: List[str]) -> Dict[str, float]:
+        """Extracts the valid 1-5 scores for the requested parameters from a JSON object response."""
+        cleaned_response = response_text.strip().replace('`json', '').replace('`', '')
+        data = json.loads(cleaned_response)
+        if not isinstance(data, dict):
+            raise ValueError("LLM did not return a JSON object.")
+        scores = {}
+        for param in parameters:
+            try:
+                score = float(data[param])
+            except (KeyError, ValueError, TypeError):
+                continue # Left for the retry
+            if 1.0 <= score <= 5.0:
+                scores[param] = score
+        return scores
+
+    @classmethod
+    def _rates_all(cls, response_text: str, parameters: List[str]) -> bool:
+        try:
+            return len(cls._parse_combined_scores(response_text, parameters)) == len(parameters)
+        except (json.JSONDecodeError, ValueError, TypeError):
+            return False
+
+    def _build_combined_prompt(self, parameters: List[str], summary: str, transcript: str) -> str:
+        questions = "\n".join(f"- {param}: {self.PROMPT_MAP[param]}" for param in parameters)
+        example = json.dumps({param: 4.0 for param in parameters})
+
+        return f'''You are an expert evaluator. Analyze the student's summary in the context of the original lecture transcript.
+
+Original Transcript:
+"""{transcript}"""
+
+Student Summary:
+"""{summary}"""
+
+Evaluation Questions:
+{questions}
+
+Rate the summary on a scale from 1 (very poor) to 5 (excellent) separately for each of the qualities above.
+
+Respond with ONLY a JSON object whose keys are the quality names and whose values are your numeric ratings.
+Example: {example}
+'''
+
+    async def _get_combined_llm_ratings(
+        self,
+        parameters: List[str],
+        summary: str,
+        transcript: str,
+        fallbacks: Optional[List[str]] = None
+    ) -> Dict[str, float]:
+        """Gets ratings for several qualitative parameters from a single LLM call."""
+        scores: Dict[str, float] = {}
+        pending = list(parameters)
+
+        # One combined call, then retry only the criteria that did not parse
+        for attempt in range(1 + settings.QUALITATIVE_COMBINED_RETRIES):
+            try:
+                response_text = await self.llm_client.generate_text(
+                    prompt=self._build_combined_prompt(pending, summary, transcript),
+                    temperature=0.1,
+                    max_tokens=30 + 20 * len(pending),
+                    caller="qualitative",
+                    # Only a reply that rates every criterion is worth serving again
+                    validate=lambda text, params=tuple(pending): self._rates_all(text, params),
+                    # A retry of the same prompt must reach the model, not a shared or cached reply
+                    bypass_cache=attempt > 0
+                )
+                scores.update(self._parse_combined_scores(response_text, pending))
+            except (json.JSONDecodeError, ValueError, TypeError) as e:
+                print(f"Error parsing combined LLM ratings for {pending}: {e}")
+            pending = [param for param in pending if param not in scores]
+            if not pending:
+                return scores
+
+        # Anything still unparsed falls back to the per-parameter path
+        fallback_scores = await asyncio.gather(
+            *(self._get_llm_rating(param, summary, transcript, fallbacks) for param in pending)
+        )
+        scores.update(zip(pending, fallback_scores))
+        return scores
+
     def _get_grammar_score(self, summary: str) -> float:
+        """Scores grammar and mechanics locally with the rule-based checker (1-5)."""
+        return self.grammar_scorer.score(summary).score
+
+    async def analyze(
+        self,
+        summary: str,
+        transcript: str,
+        parameters: List[EvaluationParameter],
+        grammar_score: Optional[float] = None,
+        fallbacks: Optional[List[str]] = None
+    ) -> Dict[str, float]:
         """
-        Simulates a grammar check. In a real application, this would integrate
-        a library like language_tool_python or an external API.
+        Analyzes the summary for qualitative aspects like clarity, coherence, etc.
+        A grammar score already computed for a batch can be passed in. Parameters
+        given the neutral fallback score are recorded in `fallbacks`.
         """
-        # Simple heuristic: penalize for very short summaries and assume a base quality
-        # This is a placeholder for a real implementation.
-        word_count = len(summary.split())
-        if word_count < 25:
-            return 3.0
-        # Mock score based on length for demonstration
-        mock_errors = max(0, 10 - word_count // 10)
-        score = 5.0 - (mock_errors / 2) # More errors = lower score
-        return max(1.0, min(5.0, score))
+        # A parameter requested twice is still rated once
+        requested = list(dict.fromkeys(param.value for param in parameters))
+        llm_params = [param for param in requested if param != 'grammar']
 
-    async def analyze(self, summary: str, transcript: str, parameters: List[EvaluationParameter]) -> Dict[str, float]:
-        """Analyzes the summary for qualitative aspects like clarity, coherence, etc."""
-        tasks = {}
-        for param in parameters:
-            param_str = param.value
-            if param_str == 'grammar':
-                # Grammar check is synchronous
-                tasks[param_str] = self._get_grammar_score(summary)
-            else:
-                # LLM calls are asynchronous
-                tasks[param_str] = self._get_llm_rating(param_str, summary, transcript)
-        
-        # Separate async and sync results
-        async_param_names = [k for k, v in tasks.items() if asyncio.iscoroutine(v)]
-        async_coroutines = [v for k, v in tasks.items() if asyncio.iscoroutine(v)]
-        
-        # Await async tasks concurrently
-        async_results = await asyncio.gather(*async_coroutines)
-        
-        # Combine results
-        final_scores = {k: v for k, v in tasks.items() if not asyncio.iscoroutine(v)}
-        final_scores.update(zip(async_param_names, async_results))
+        final_scores = {}
+        if 'grammar' in requested:
+            # Grammar check is local and synchronous (low milliseconds)
+            final_scores['grammar'] = grammar_score if grammar_score is not None else self._get_grammar_score(summary)
+
+        if settings.QUALITATIVE_COMBINED_RATING and len(llm_params) > 1:
+            # Rate every LLM-judged parameter in one call
+            llm_scores = await self._get_combined_llm_ratings(llm_params, summary, transcript, fallbacks)
+        else:
+            # One LLM call per parameter, awaited concurrently
+            llm_results = await asyncio.gather(
+                *(self._get_llm_rating(param, summary, transcript, fallbacks) for param in llm_params)
+            )
+            llm_scores = dict(zip(llm_params, llm_results))
+
+        # Keep the order the parameters were requested in
+        final_scores.update(llm_scores)
+        final_scores = {param: final_scores[param] for param in requested}
 
         # The scores are currently on a 1-5 scale. They will be normalized by the scoring engine.
         return final_scores
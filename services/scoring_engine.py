@@ -1,8 +1,12 @@
 # services/scoring_engine.py
 
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 from config import settings
 
+# Parameters already on a 0-1 scale; every other score is a 1-5 rating
+UNIT_SCALE_PARAMETERS = ('coverage', 'relevance')
+
 class ScoringEngine:
     def __init__(self):
         self.weights = settings.SCORING_WEIGHTS
@@ -10,6 +14,20 @@ class ScoringEngine:
         if abs(sum(self.weights.values()) - 1.0) > 1e-6:
             print("Warning: Scoring weights do not sum to 1.0. Normalization will be affected.")
 
+    def resolve_weights(self, overrides: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """The configured weights with per-request overrides applied; they must still sum to 1.0."""
+        if not overrides:
+            return dict(self.weights)
+        unknown = set(overrides) - set(self.weights)
+        if unknown:
+            raise ValueError(f"Unknown scoring parameters: {', '.join(sorted(unknown))}.")
+        if any(weight < 0 for weight in overrides.values()):
+            raise ValueError("Scoring weights must not be negative.")
+        weights = {**self.weights, **overrides}
+        if abs(sum(weights.values()) - 1.0) > 1e-6:
+            raise ValueError(f"Scoring weights must sum to 1.0 (got {sum(weights.values()):.4f}).")
+        return weights
+
     def _normalize_score(self, score: float, scale_min: float, scale_max: float) -> float:
         """Normalizes a score from its original scale (e.g., 1-5) to a 0-10 scale."""
         if scale_min == scale_max:
@@ -19,36 +37,93 @@ class ScoringEngine:
         # Then scale to 0-10
         return normalized_0_1 * 10
 
-    def calculate_final_score(self, raw_scores: Dict[str, float]) -> Tuple[float, Dict[str, float]]:
+    def calculate_final_score(
+        self,
+        raw_scores: Dict[str, float],
+        weights: Optional[Dict[str, float]] = None
+    ) -> Tuple[float, Dict[str, float]]:
         """
         Aggregates raw scores into a final weighted score.
-        
+
         Args:
             raw_scores: A dictionary of scores, e.g., {'coverage': 0.8, 'clarity': 4.5}.
                         'coverage' and 'relevance' are expected to be 0-1.
                         Qualitative scores are expected to be 1-5.
+            weights: Weights to use instead of the configured ones.
 
         Returns:
             A tuple containing:
             - The final aggregated score (0-10).
             - A dictionary of individual scores, all normalized to a 0-10 scale.
         """
+        weights = weights if weights is not None else self.weights
         final_score = 0.0
         normalized_scores = {}
 
         for param, score in raw_scores.items():
-            if param not in self.weights:
+            if param not in weights:
                 continue # Ignore scores without a defined weight
 
             # Normalize scores to a common 0-10 scale
-            if param in ['coverage', 'relevance']:
+            if param in UNIT_SCALE_PARAMETERS:
                 # These are already 0-1, so just scale by 10
                 normalized_scores[param] = score * 10.0
             else:
                 # Assume qualitative scores are 1-5
                 normalized_scores[param] = self._normalize_score(score, 1.0, 5.0)
-            
+
             # Add to weighted final score
-            final_score += normalized_scores[param] * self.weights[param]
+            final_score += normalized_scores[param] * weights[param]
 
         return round(final_score, 2), {k: round(v, 2) for k, v in normalized_scores.items()}
+
+    def calculate_final_scores(
+        self,
+        raw_scores: np.ndarray,
+        parameters: List[str],
+        weights: Optional[Dict[str, float]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Batch version of calculate_final_score for a whole cohort.
+
+        Args:
+            raw_scores: An (evaluations x parameters) matrix of raw scores, NaN where
+                        an evaluation has no score for a parameter.
+            parameters: The parameter name of each column.
+            weights: Weights to use instead of the configured ones.
+
+        Returns:
+            The final scores (0-10) and the matrix of normalized scores (0-10, NaN
+            where missing), both rounded to 2 places.
+        """
+        weights = weights if weights is not None else self.weights
+        raw_scores = np.asarray(raw_scores, dtype=np.float64)
+        unit_scale = np.array([param in UNIT_SCALE_PARAMETERS for param in parameters])
+        # 0-1 scores scale by 10; 1-5 ratings map (x - 1) / 4 onto 0-10
+        normalized = np.where(unit_scale, raw_scores * 10.0, (raw_scores - 1.0) * 2.5)
+        weight_vector = np.array([weights.get(param, 0.0) for param in parameters], dtype=np.float64)
+        final_scores = np.nan_to_num(normalized, nan=0.0) @ weight_vector
+        return np.round(final_scores, 2), np.round(normalized, 2)
+
+    def rescore(
+        self,
+        raw_scores: List[Dict[str, float]],
+        weights: Optional[Dict[str, float]] = None
+    ) -> List[Tuple[float, Dict[str, float]]]:
+        """Rebuilds (final score, normalized scores) for many stored evaluations in one vectorised pass."""
+        if not raw_scores:
+            return []
+        weights = weights if weights is not None else self.weights
+        # Parameters without a weight are ignored, as in calculate_final_score
+        parameters = [param for param in weights if any(param in scores for scores in raw_scores)]
+        matrix = np.array(
+            [[scores.get(param, np.nan) for param in parameters] for scores in raw_scores],
+            dtype=np.float64
+        ).reshape(len(raw_scores), len(parameters))
+        final_scores, normalized = self.calculate_final_scores(matrix, parameters, weights)
+
+        results = []
+        for final_score, row, scores in zip(final_scores.tolist(), normalized.tolist(), raw_scores):
+            individual = {param: value for param, value in zip(parameters, row) if param in scores}
+            results.append((final_score, individual))
+        return results
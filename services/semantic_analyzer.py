@@ -1,47 +1,226 @@
 # services/semantic_analyzer.py
 
-from typing import List, Dict
-from sentence_transformers import SentenceTransformer, util
+import asyncio
+from typing import List, Dict, Optional, Tuple
 from config import settings
-import torch
+from utils.embedding_backends import build_embedding_backend
+from utils.embedding_batcher import EmbeddingBatcher
+from utils.embedding_cache import EmbeddingCache
+from utils.metrics import EMBEDDING_CACHE_LOOKUPS
+import numpy as np
+
+def cosine_similarity_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Cosine similarity between every row of `a` and every row of `b`."""
+    a_norm = a / np.clip(np.linalg.norm(a, axis=1, keepdims=True), 1e-12, None)
+    b_norm = b / np.clip(np.linalg.norm(b, axis=1, keepdims=True), 1e-12, None)
+    return a_norm @ b_norm.T
+
+def chunk_text(text: str, window_words: int, overlap_words: int) -> List[str]:
+    """Splits text into overlapping word windows that fit the encoder's input limit."""
+    words = text.split()
+    if len(words) <= window_words:
+        return [" ".join(words)]
+    step = max(1, window_words - overlap_words)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + window_words]))
+        if start + window_words >= len(words):
+            break
+    return chunks
+
+def pool_similarities(similarities: np.ndarray, pooling: str, top_k: int) -> np.ndarray:
+    """Reduces a summaries x chunks similarity matrix to one score per summary."""
+    if pooling == "max":
+        return similarities.max(axis=1)
+    if pooling == "mean":
+        return similarities.mean(axis=1)
+    if pooling == "top_k":
+        k = max(1, min(top_k, similarities.shape[1]))
+        # Mean of the k best-matching chunks for each summary
+        top = np.partition(similarities, similarities.shape[1] - k, axis=1)[:, -k:]
+        return top.mean(axis=1)
+    raise ValueError(f"Unknown relevance pooling '{pooling}'. Expected 'max', 'mean' or 'top_k'.")
 
 class SemanticAnalyzer:
     def __init__(self):
-        # Load the model only once
-        self.model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
-        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
-        self.model.to(self.device)
+        # The model is loaded lazily (or by warmup()), so constructing this is cheap
+        self.backend = build_embedding_backend(
+            backend=settings.EMBEDDING_BACKEND,
+            model_name=settings.EMBEDDING_MODEL_NAME,
+            batch_size=settings.EMBEDDING_MAX_BATCH_SIZE,
+            num_threads=settings.EMBEDDING_NUM_THREADS,
+            onnx_file_name=settings.EMBEDDING_ONNX_FILE_NAME,
+            socket_path=settings.EMBEDDING_SERVER_SOCKET
+        )
+        self.ready = False
+        # Encoding runs off the event loop, batched across concurrent requests
+        self.batcher = EmbeddingBatcher(
+            encode_fn=self._encode,
+            max_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE,
+            max_wait_ms=settings.EMBEDDING_MAX_WAIT_MS,
+            num_workers=settings.EMBEDDING_WORKERS
+        )
+        # Transcripts and concepts repeat across a grading window, so keep their vectors
+        self.cache = EmbeddingCache(
+            # Backends produce slightly different vectors, so they must not share entries
+            model_name=f"{settings.EMBEDDING_MODEL_NAME}:{self.vector_source()}",
+            max_bytes=settings.EMBEDDING_CACHE_MAX_BYTES,
+            dtype=settings.EMBEDDING_CACHE_DTYPE,
+            persist_dir=settings.EMBEDDING_CACHE_DIR
+        ) if settings.EMBEDDING_CACHE_ENABLED else None
 
-    def _get_embeddings(self, texts: List[str]):
-        return self.model.encode(texts, convert_to_tensor=True, device=self.device)
+    @staticmethod
+    def vector_source() -> str:
+        """The backend that actually produces the vectors (the server's, in remote mode)."""
+        if settings.EMBEDDING_BACKEND == "remote":
+            return settings.EMBEDDING_SERVER_BACKEND
+        return settings.EMBEDDING_BACKEND
 
-    def analyze(self, summary: str, transcript: str, key_concepts: List[str]) -> Dict[str, float]:
-        """Calculates semantic coverage and relevance scores."""
-        if not key_concepts:
-            return {"coverage": 0.0, "relevance": 0.0}
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self.backend.encode(texts)
+
+    async def warmup(self):
+        """Loads the model and runs a throwaway encode so the first request doesn't pay for initialisation."""
+        await asyncio.get_running_loop().run_in_executor(None, self.backend.load)
+        await self.batcher.encode(["Warm-up sentence for the embedding model."])
+        self.ready = True
 
-        # Embeddings
-        summary_embedding = self._get_embeddings([summary])
-        transcript_embedding = self._get_embeddings([transcript])
-        concept_embeddings = self._get_embeddings(key_concepts)
+    async def _get_embeddings(self, texts: List[str]) -> np.ndarray:
+        if self.cache is None:
+            return await self.batcher.encode(texts)
 
+        cached = self.cache.get_many(texts)
+        if self.cache.persist_dir and len(cached) < len(texts):
+            # The disk tier does blocking file I/O, so keep it off the event loop
+            absent = [i for i in range(len(texts)) if i not in cached]
+            loaded = await asyncio.to_thread(self.cache.load_many, [texts[i] for i in absent])
+            cached.update({absent[j]: vector for j, vector in loaded.items()})
+        EMBEDDING_CACHE_LOOKUPS.inc(len(cached), result="hit")
+        EMBEDDING_CACHE_LOOKUPS.inc(len(texts) - len(cached), result="miss")
+        # Encode each distinct uncached text once
+        missing = list(dict.fromkeys(t for i, t in enumerate(texts) if i not in cached))
+        encoded = {}
+        if missing:
+            vectors = await self.batcher.encode(missing)
+            # Score with the precision the cache stores, so a repeat request reads back identical vectors
+            vectors = np.asarray(vectors, dtype=self.cache.dtype).astype(np.float32)
+            self.cache.put_many(missing, vectors)
+            if self.cache.persist_dir:
+                await asyncio.to_thread(self.cache.persist_many, missing, vectors)
+            encoded = dict(zip(missing, vectors))
+
+        return np.stack([cached[i] if i in cached else encoded[t] for i, t in enumerate(texts)])
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """Embeds texts through the cache and the batcher."""
+        return await self._get_embeddings(texts)
+
+    def _transcript_segments(self, transcript: str) -> List[str]:
+        """The texts embedded to represent the transcript: overlapping chunks, or the whole text."""
+        if not settings.TRANSCRIPT_CHUNKING_ENABLED:
+            return [transcript]
+        return chunk_text(transcript, settings.TRANSCRIPT_CHUNK_WORDS, settings.TRANSCRIPT_CHUNK_OVERLAP_WORDS)
+
+    def _score(
+        self,
+        summary_embeddings: np.ndarray,
+        transcript_embeddings: np.ndarray,
+        concept_embeddings: np.ndarray
+    ) -> List[Dict[str, float]]:
+        """Scores every summary row against the transcript chunks and the key concepts."""
         # 1. Calculate Relevance
-        # Cosine similarity between the entire summary and the entire transcript
-        relevance_similarity = util.cos_sim(summary_embedding, transcript_embedding).item()
-        relevance_score = max(0.0, relevance_similarity) # Ensure non-negative
+        # Cosine similarity between each summary and every transcript chunk, pooled per summary
+        relevance_similarities = pool_similarities(
+            cosine_similarity_matrix(summary_embeddings, transcript_embeddings),
+            pooling=settings.RELEVANCE_POOLING,
+            top_k=settings.RELEVANCE_TOP_K
+        )
+        relevance_scores = np.maximum(0.0, relevance_similarities) # Ensure non-negative
 
         # 2. Calculate Coverage
-        # Check how many key concepts are semantically present in the summary
-        # Find the cosine similarity between each concept and the summary
-        coverage_similarities = util.cos_sim(summary_embedding, concept_embeddings)
-        
+        # Check how many key concepts are semantically present in each summary
+        # using a single summaries x concepts similarity matrix
+        coverage_similarities = cosine_similarity_matrix(summary_embeddings, concept_embeddings)
+
         # A concept is considered 'covered' if its similarity to the summary is above a threshold
         coverage_threshold = 0.5
-        covered_concepts_count = (coverage_similarities > coverage_threshold).sum().item()
-        
-        coverage_score = (covered_concepts_count / len(key_concepts))
-
-        return {
-            "coverage": round(coverage_score, 3),
-            "relevance": round(relevance_score, 3)
-        }
+        covered_concepts_counts = (coverage_similarities > coverage_threshold).sum(axis=1)
+
+        coverage_scores = covered_concepts_counts / concept_embeddings.shape[0]
+
+        return [
+            {
+                "coverage": round(float(coverage), 3),
+                "relevance": round(float(relevance), 3)
+            }
+            for coverage, relevance in zip(coverage_scores, relevance_scores)
+        ]
+
+    async def embed_lecture(self, transcript: str, key_concepts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Embeds a lecture's transcript chunks and key concepts, e.g. for precomputed artifacts."""
+        segments = self._transcript_segments(transcript)
+        embeddings = await self._get_embeddings([*segments, *key_concepts])
+        return embeddings[:len(segments)], embeddings[len(segments):]
+
+    async def similarities(
+        self,
+        queries: List[str],
+        passages: List[str],
+        passage_embeddings: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Cosine similarity of every query to every passage (queries x passages)."""
+        if passage_embeddings is None:
+            embeddings = await self._get_embeddings([*queries, *passages])
+            query_embeddings, passage_embeddings = embeddings[:len(queries)], embeddings[len(queries):]
+        else:
+            query_embeddings = await self._get_embeddings(queries)
+        return cosine_similarity_matrix(query_embeddings, passage_embeddings)
+
+    async def analyze(
+        self,
+        summary: str,
+        transcript: str,
+        key_concepts: List[str],
+        transcript_embeddings: Optional[np.ndarray] = None,
+        concept_embeddings: Optional[np.ndarray] = None
+    ) -> Dict[str, float]:
+        """Calculates semantic coverage and relevance scores."""
+        return (await self.analyze_many(
+            [summary], transcript, key_concepts,
+            transcript_embeddings=transcript_embeddings,
+            concept_embeddings=concept_embeddings
+        ))[0]
+
+    async def analyze_many(
+        self,
+        summaries: List[str],
+        transcript: str,
+        key_concepts: List[str],
+        transcript_embeddings: Optional[np.ndarray] = None,
+        concept_embeddings: Optional[np.ndarray] = None
+    ) -> List[Dict[str, float]]:
+        """
+        Calculates coverage and relevance for many summaries of the same transcript.
+        Precomputed transcript chunk and concept embeddings are used when given.
+        """
+        if not key_concepts:
+            return [{"coverage": 0.0, "relevance": 0.0} for _ in summaries]
+
+        if transcript_embeddings is not None and concept_embeddings is not None:
+            summary_embeddings = await self._get_embeddings(summaries)
+            return self._score(summary_embeddings, transcript_embeddings, concept_embeddings)
+
+        segments = self._transcript_segments(transcript)
+
+        # Embeddings (a single request so they share one batch); chunk vectors
+        # are content-addressed, so other requests for the same lecture reuse them
+        embeddings = await self._get_embeddings([*summaries, *segments, *key_concepts])
+        n, m = len(summaries), len(segments)
+        summary_embeddings = embeddings[:n]
+        transcript_embeddings = embeddings[n:n + m]
+        concept_embeddings = embeddings[n + m:]
+
+        return self._score(summary_embeddings, transcript_embeddings, concept_embeddings)
+
+    async def close(self):
+        await self.batcher.close()
@@ -0,0 +1,57 @@
+# services/template_feedback.py
+
+from typing import Dict
+
+STRENGTHS = {
+    'coverage': "you captured most of the lecture's key ideas",
+    'relevance': "your summary stays focused on what the lecture actually discussed",
+    'clarity': "your sentences are clear and easy to follow",
+    'coherence': "your ideas flow logically from one to the next",
+    'conciseness': "you get the main points across without padding",
+    'grammar': "your writing is accurate and well punctuated"
+}
+IMPROVEMENTS = {
+    'coverage': "check the lecture's main topics and include the ones you left out",
+    'relevance': "keep to the content of the lecture rather than outside material",
+    'clarity': "break up long sentences and prefer plain wording",
+    'coherence': "link your points with transitions so each follows from the last",
+    'conciseness': "cut repetition and filler so every sentence adds something",
+    'grammar': "proofread for spelling, capitalisation and punctuation slips"
+}
+IMPROVEMENT_THRESHOLD = 7.0
+# Below this even the strongest area isn't worth praising
+PRAISE_THRESHOLD = 6.0
+
+class TemplateFeedbackGenerator:
+    """Builds a feedback paragraph from the scores alone, without an LLM."""
+
+    def generate(self, individual_scores: Dict[str, float]) -> str:
+        """
+        Names the strongest area (praising it only if it scores at least 6/10),
+        then up to two areas scoring below 7/10.
+        """
+        known = {param: score for param, score in individual_scores.items() if param in STRENGTHS}
+        if not known:
+            return "Thank you for your summary."
+        ranked = sorted(known, key=known.get, reverse=True)
+        strongest = ranked[0]
+        weakest = [param for param in reversed(ranked[1:]) if known[param] < IMPROVEMENT_THRESHOLD][:2]
+
+        if known[strongest] < PRAISE_THRESHOLD:
+            # Nothing stands out, so lead with what to work on
+            weakest = list(reversed(ranked))[:2]
+            suggestions = " Also, ".join(
+                f"{IMPROVEMENTS[param]} ({param}: {known[param]:.1f}/10)." for param in weakest
+            )
+            feedback = f"Your summary needs more work before it meets the standard. Start here: {suggestions}"
+            if strongest not in weakest:
+                feedback += f" Your relatively strongest area is {strongest} ({known[strongest]:.1f}/10)."
+            return feedback
+
+        feedback = f"Well done: {STRENGTHS[strongest]} ({known[strongest]:.1f}/10)."
+        if not weakest:
+            return feedback + " Keep up this standard across every part of your summary."
+        suggestions = " Also, ".join(
+            f"{IMPROVEMENTS[param]} ({param}: {known[param]:.1f}/10)." for param in weakest
+        )
+        return f"{feedback} To improve, {suggestions}"
@@ -0,0 +1,6 @@
+# tests/conftest.py
+
+import os
+
+# Settings require an API key; tests never reach the real API
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
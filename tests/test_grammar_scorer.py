@@ -0,0 +1,21 @@
+# tests/test_grammar_scorer.py
+
+from services.grammar_scorer import GrammarScorer
+
+def test_articles_before_acronyms_and_letters_are_not_flagged():
+    counts = GrammarScorer().count_issues("The scan is an MRI. It uses an X-ray, an x-ray and a URL.")
+    assert counts["article"] == 0
+
+def test_wrong_articles_are_still_flagged():
+    counts = GrammarScorer().count_issues("It was a apple. An banana followed.")
+    assert counts["article"] == 2
+
+def test_abbreviations_do_not_end_sentences():
+    counts = GrammarScorer().count_issues(
+        "Some metals, e.g. copper, conduct well, i.e. they carry current. Output in the U.S. rose."
+    )
+    assert counts["sentence_case"] == 0
+
+def test_lowercase_sentence_start_is_still_flagged():
+    counts = GrammarScorer().count_issues("The lecture ended. then questions began.")
+    assert counts["sentence_case"] == 1
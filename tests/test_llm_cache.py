@@ -0,0 +1,68 @@
+# tests/test_llm_cache.py
+
+import asyncio
+from types import SimpleNamespace
+
+from services.concept_extractor import ConceptExtractor
+from utils.llm_cache import InMemoryLLMCache, SQLiteLLMCache
+from utils.llm_client import LLMClient
+
+def _completion(text: str):
+    return SimpleNamespace(
+        usage=None,
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text))]
+    )
+
+def _scripted_client(replies):
+    """An LLMClient with an in-memory cache whose upstream returns `replies` in order."""
+    client = LLMClient(api_key="test-key", cache=InMemoryLLMCache(max_entries=100, ttl_seconds=3600))
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        return _completion(replies[len(calls) - 1])
+
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return client, calls
+
+def test_unparseable_reply_is_not_served_again():
+    client, calls = _scripted_client(["Sure! Here are the concepts:", '["Entropy", "Heat death"]'])
+    extractor = ConceptExtractor(client)
+
+    async def scenario():
+        first = await extractor.extract("A lecture on thermodynamics.")
+        second = await extractor.extract("A lecture on thermodynamics.")
+        third = await extractor.extract("A lecture on thermodynamics.")
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert first == []
+    assert second == ["Entropy", "Heat death"]
+    # The valid reply is cached, the malformed one was not
+    assert third == second
+    assert len(calls) == 2
+
+def test_bypass_cache_skips_a_cached_reply():
+    client, calls = _scripted_client(["first", "second"])
+
+    async def scenario():
+        await client.generate_text("prompt", temperature=0.1)
+        return await client.generate_text("prompt", temperature=0.1, bypass_cache=True)
+
+    assert asyncio.run(scenario()) == "second"
+    assert len(calls) == 2
+
+def test_sqlite_cache_evicts_beyond_max_entries(tmp_path):
+    cache = SQLiteLLMCache(str(tmp_path / "llm.db"), ttl_seconds=3600, max_entries=3, prune_every=1)
+    for i in range(5):
+        cache.set(f"key-{i}", f"value-{i}")
+    assert [cache.get(f"key-{i}") for i in range(5)] == [None, None, "value-2", "value-3", "value-4"]
+    cache.close()
+
+def test_sqlite_cache_prunes_expired_rows(tmp_path):
+    cache = SQLiteLLMCache(str(tmp_path / "llm.db"), ttl_seconds=-1, max_entries=100, prune_every=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    count = cache._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+    assert count == 0
+    cache.close()
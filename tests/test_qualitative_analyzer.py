@@ -0,0 +1,57 @@
+# tests/test_qualitative_analyzer.py
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from schemas import EvaluationParameter
+from services.qualitative_analyzer import QualitativeAnalyzer
+from utils.llm_cache import InMemoryLLMCache
+from utils.llm_client import LLMClient
+
+def _completion(text: str):
+    return SimpleNamespace(
+        usage=None,
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text))]
+    )
+
+def test_combined_rating_retries_past_a_malformed_reply():
+    client = LLMClient(api_key="test-key", cache=InMemoryLLMCache(max_entries=100, ttl_seconds=3600))
+    replies = ["I'd rate it highly!", json.dumps({"clarity": 4.0, "coherence": 3.5})]
+    prompts = []
+
+    async def create(**kwargs):
+        prompts.append(kwargs["messages"][-1]["content"])
+        return _completion(replies[len(prompts) - 1])
+
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    analyzer = QualitativeAnalyzer(client)
+
+    scores = asyncio.run(analyzer.analyze(
+        "A short summary.", "A short transcript.",
+        [EvaluationParameter.CLARITY, EvaluationParameter.COHERENCE]
+    ))
+
+    assert scores == {"clarity": 4.0, "coherence": 3.5}
+    # Both calls were the combined prompt; nothing fell back to per-parameter ratings
+    assert len(prompts) == 2
+    assert all("quality names" in prompt for prompt in prompts)
+
+def test_unparseable_ratings_are_reported_as_fallbacks():
+    client = LLMClient(api_key="test-key", cache=InMemoryLLMCache(max_entries=100, ttl_seconds=3600))
+
+    async def create(**kwargs):
+        return _completion("Pretty good overall.")
+
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    analyzer = QualitativeAnalyzer(client)
+    fallbacks = []
+
+    scores = asyncio.run(analyzer.analyze(
+        "A short summary.", "A short transcript.",
+        [EvaluationParameter.CLARITY, EvaluationParameter.COHERENCE, EvaluationParameter.GRAMMAR],
+        fallbacks=fallbacks
+    ))
+
+    assert scores["clarity"] == scores["coherence"] == 2.5
+    assert sorted(fallbacks) == ["clarity", "coherence"]
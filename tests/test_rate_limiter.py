@@ -0,0 +1,108 @@
+# tests/test_rate_limiter.py
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils.llm_client import LLMClient
+from utils.rate_limiter import CircuitBreaker, CircuitOpenError, TokenBucket
+
+def _completion(text: str):
+    return SimpleNamespace(
+        usage=None,
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text))]
+    )
+
+def test_cancelled_half_open_trial_releases_the_circuit():
+    async def scenario():
+        client = LLMClient(api_key="test-key")
+        breaker = client.circuit_breaker
+        # Open the circuit and let the reset timeout pass
+        breaker.opened_at = time.monotonic() - breaker.reset_timeout - 1
+        assert breaker.state == "half_open"
+
+        stalled = asyncio.Event()
+
+        async def hang(**kwargs):
+            stalled.set()
+            await asyncio.sleep(3600)
+
+        client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=hang)))
+        # High-temperature calls bypass the shielded singleflight task, so cancellation reaches the request
+        trial = asyncio.create_task(client.generate_text("prompt", temperature=0.9))
+        await stalled.wait()
+        trial.cancel()
+        try:
+            await trial
+        except asyncio.CancelledError:
+            pass
+        assert breaker.state == "half_open"
+
+        async def answer(**kwargs):
+            return _completion("recovered")
+
+        client.client.chat.completions.create = answer
+        assert await client.generate_text("prompt", temperature=0.9) == "recovered"
+        assert breaker.state == "closed"
+
+    asyncio.run(scenario())
+
+def test_half_open_allows_a_single_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.release_trial()
+    breaker.before_call()
+
+def test_large_request_does_not_block_small_ones():
+    async def scenario():
+        bucket = TokenBucket(rate_per_minute=600, capacity=10)  # 10 tokens/s
+        bucket.tokens = 2.0
+        large = asyncio.create_task(bucket.acquire(10))  # needs ~0.8s of refill
+        await asyncio.sleep(0)
+        started = time.monotonic()
+        await bucket.acquire(1)
+        elapsed = time.monotonic() - started
+        large.cancel()
+        return elapsed
+
+    assert asyncio.run(scenario()) < 0.1
+
+def test_stream_holds_its_concurrency_slot_until_closed():
+    async def scenario():
+        client = LLMClient(api_key="test-key")
+        closed = []
+
+        class FakeStream:
+            def __init__(self):
+                self._chunks = iter(["Good ", "work."])
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                try:
+                    text = next(self._chunks)
+                except StopIteration:
+                    raise StopAsyncIteration
+                return SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+            async def close(self):
+                closed.append(True)
+
+        async def open_stream(**kwargs):
+            return FakeStream()
+
+        client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=open_stream)))
+        free_slots = client._concurrency._value
+        tokens = client.stream_text("prompt")
+        assert await tokens.__anext__() == "Good "
+        assert client._concurrency._value == free_slots - 1
+        await tokens.aclose()
+        assert closed and client._concurrency._value == free_slots
+
+    asyncio.run(scenario())
@@ -0,0 +1,69 @@
+# tests/test_score_store.py
+
+import pytest
+
+from utils.score_store import InMemoryScoreStore, SQLiteScoreStore, build_score_store
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    store = build_score_store(request.param, str(tmp_path / "scores" / "scores.sqlite3"))
+    yield store
+    store.close()
+
+def test_round_trip(store):
+    store.save("e1", {"coverage": 0.75, "clarity": 4.5}, cohort_id="c1", student_id="s1")
+    [record] = store.get_many(["e1"])
+    assert record["evaluation_id"] == "e1"
+    assert record["cohort_id"] == "c1"
+    assert record["student_id"] == "s1"
+    assert record["raw_scores"] == {"coverage": 0.75, "clarity": 4.5}
+    assert isinstance(record["created_at"], float)
+
+def test_get_many_keeps_request_order_and_skips_unknown_ids(store):
+    store.save_many([
+        {"evaluation_id": f"e{i}", "cohort_id": None, "student_id": None, "raw_scores": {"coverage": i / 10}}
+        for i in range(3)
+    ])
+    records = store.get_many(["e2", "missing", "e0"])
+    assert [r["evaluation_id"] for r in records] == ["e2", "e0"]
+    assert store.get_many([]) == []
+
+def test_get_many_beyond_the_sqlite_parameter_limit(store):
+    ids = [f"e{i}" for i in range(1200)]
+    store.save_many([{"evaluation_id": i, "raw_scores": {"coverage": 0.5}} for i in ids])
+    assert [r["evaluation_id"] for r in store.get_many(ids[::-1])] == ids[::-1]
+
+def test_by_cohort(store):
+    store.save("a", {"coverage": 0.1}, cohort_id="c1")
+    store.save("b", {"coverage": 0.2}, cohort_id="c2")
+    store.save("c", {"coverage": 0.3}, cohort_id="c1")
+    assert [r["evaluation_id"] for r in store.by_cohort("c1")] == ["a", "c"]
+    assert store.by_cohort("none") == []
+
+def test_save_replaces_an_existing_record(store):
+    store.save("e1", {"coverage": 0.1}, cohort_id="c1")
+    store.save("e1", {"coverage": 0.9}, cohort_id="c2")
+    [record] = store.get_many(["e1"])
+    assert record["raw_scores"] == {"coverage": 0.9}
+    assert store.by_cohort("c1") == []
+
+def test_sqlite_store_survives_reopening(tmp_path):
+    path = str(tmp_path / "scores.sqlite3")
+    store = SQLiteScoreStore(path)
+    store.save("e1", {"grammar": 3.5}, cohort_id="c1")
+    store.close()
+    reopened = SQLiteScoreStore(path)
+    try:
+        assert reopened.by_cohort("c1")[0]["raw_scores"] == {"grammar": 3.5}
+    finally:
+        reopened.close()
+
+def test_memory_store_drops_the_oldest_records():
+    store = InMemoryScoreStore(max_records=2)
+    for i in range(3):
+        store.save(f"e{i}", {"coverage": 0.5})
+    assert [r["evaluation_id"] for r in store.get_many(["e0", "e1", "e2"])] == ["e1", "e2"]
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        build_score_store("redis", "unused")
@@ -0,0 +1,85 @@
+# tests/test_scoring_engine.py
+
+import numpy as np
+import pytest
+
+from services.scoring_engine import ScoringEngine
+
+def _random_raw_scores(rng, n: int, parameters):
+    """Raw scores on each parameter's own scale, each one missing with some probability."""
+    rows = []
+    for _ in range(n):
+        row = {}
+        for param in parameters:
+            if rng.random() < 0.2:
+                continue
+            row[param] = float(rng.random()) if param in ("coverage", "relevance") else float(1 + 4 * rng.random())
+        rows.append(row)
+    return rows
+
+@pytest.fixture
+def engine():
+    return ScoringEngine()
+
+def _assert_matches_single_path(engine, raw_scores, weights=None):
+    batched = engine.rescore(raw_scores, weights)
+    assert len(batched) == len(raw_scores)
+    for row, (final_score, individual) in zip(raw_scores, batched):
+        expected_final, expected_individual = engine.calculate_final_score(row, weights)
+        assert final_score == pytest.approx(expected_final, abs=1e-9)
+        assert individual.keys() == expected_individual.keys()
+        for param, score in individual.items():
+            assert score == pytest.approx(expected_individual[param], abs=1e-9)
+
+def test_vectorised_path_matches_single_path(engine):
+    rng = np.random.default_rng(0)
+    raw_scores = _random_raw_scores(rng, 500, list(engine.weights))
+    _assert_matches_single_path(engine, raw_scores)
+
+def test_missing_parameters_are_skipped_not_zeroed(engine):
+    raw_scores = [{"coverage": 0.5}, {"coverage": 0.5, "clarity": 5.0}, {}]
+    results = engine.rescore(raw_scores)
+    assert results[0] == (1.75, {"coverage": 5.0})
+    assert results[1][1] == {"coverage": 5.0, "clarity": 10.0}
+    assert results[2] == (0.0, {})
+    _assert_matches_single_path(engine, raw_scores)
+
+def test_parameters_without_a_weight_are_ignored(engine):
+    raw_scores = [{"coverage": 0.5, "unknown": 3.0}]
+    assert engine.rescore(raw_scores) == [engine.calculate_final_score(raw_scores[0])]
+
+def test_zero_weight_overrides(engine):
+    weights = engine.resolve_weights({"coverage": 0.0, "relevance": 0.6})
+    rng = np.random.default_rng(1)
+    raw_scores = _random_raw_scores(rng, 200, list(engine.weights))
+    _assert_matches_single_path(engine, raw_scores, weights)
+    # A zero-weighted parameter is still reported but adds nothing
+    final_score, individual = engine.rescore([{"coverage": 1.0}], weights)[0]
+    assert final_score == 0.0
+    assert individual == {"coverage": 10.0}
+
+def test_empty_override_dict_keeps_the_configured_weights(engine):
+    assert engine.resolve_weights({}) == dict(engine.weights)
+    assert engine.resolve_weights(None) == dict(engine.weights)
+
+def test_explicit_empty_weights_are_not_replaced_by_defaults(engine):
+    raw_scores = [{"coverage": 0.8, "clarity": 4.0}]
+    assert engine.rescore(raw_scores, {}) == [engine.calculate_final_score(raw_scores[0], {})] == [(0.0, {})]
+
+def test_calculate_final_scores_marks_missing_as_nan(engine):
+    matrix = np.array([[0.5, np.nan], [np.nan, 3.0]])
+    final_scores, normalized = engine.calculate_final_scores(matrix, ["coverage", "clarity"])
+    assert np.isnan(normalized[0, 1]) and np.isnan(normalized[1, 0])
+    assert final_scores.tolist() == [1.75, 0.5]
+
+def test_empty_batch(engine):
+    assert engine.rescore([]) == []
+
+@pytest.mark.parametrize("overrides, message", [
+    ({"unknown": 0.1}, "Unknown scoring parameters"),
+    ({"coverage": -0.1, "relevance": 0.7}, "must not be negative"),
+    ({"coverage": 0.9}, "must sum to 1.0"),
+])
+def test_invalid_overrides_are_rejected(engine, overrides, message):
+    with pytest.raises(ValueError, match=message):
+        engine.resolve_weights(overrides)
@@ -0,0 +1,124 @@
+# utils/embedding_backends.py
+
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+class EmbeddingBackend:
+    """
+    Turns texts into embedding vectors. Heavy libraries (torch,
+    sentence-transformers, onnxruntime) are imported and the model is loaded
+    on first use or on an explicit `load()`, never at construction.
+    """
+
+    def __init__(self, model_name: str, batch_size: int = 64):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._model = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self):
+        with self._load_lock:
+            if self._model is None:
+                self._model = self._load_model()
+
+    def _load_model(self):
+        raise NotImplementedError
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if self._model is None:
+            self.load()
+        return self._model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            **self._encode_kwargs()
+        ).astype(np.float32, copy=False)
+
+    def _encode_kwargs(self) -> dict:
+        return {}
+
+class TorchEmbeddingBackend(EmbeddingBackend):
+    """The sentence-transformers model on torch, on GPU if one is available."""
+
+    def __init__(self, model_name: str, batch_size: int = 64, device: Optional[str] = None, num_threads: Optional[int] = None):
+        super().__init__(model_name, batch_size)
+        self.device = device
+        self.num_threads = num_threads
+
+    def _load_model(self):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if self.num_threads:
+            torch.set_num_threads(self.num_threads)
+        if self.device is None:
+            self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        model = SentenceTransformer(self.model_name, device=self.device)
+        model.eval()
+        return model
+
+    def _encode_kwargs(self) -> dict:
+        return {"device": self.device}
+
+class QuantizedTorchEmbeddingBackend(TorchEmbeddingBackend):
+    """
+    The torch model with its Linear layers dynamically quantized to int8.
+    CPU only; typically ~2x faster per encode with a negligible change in
+    cosine similarities.
+    """
+
+    def __init__(self, model_name: str, batch_size: int = 64, num_threads: Optional[int] = None):
+        super().__init__(model_name, batch_size, device="cpu", num_threads=num_threads)
+
+    def _load_model(self):
+        import torch
+
+        model = super()._load_model()
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+class OnnxEmbeddingBackend(EmbeddingBackend):
+    """
+    The model exported to ONNX and run with ONNX Runtime on CPU, via
+    sentence-transformers' ONNX backend. Requires `optimum[onnxruntime]`.
+    """
+
+    def __init__(self, model_name: str, batch_size: int = 64, file_name: Optional[str] = None):
+        super().__init__(model_name, batch_size)
+        self.file_name = file_name
+
+    def _load_model(self):
+        try:
+            from sentence_transformers import SentenceTransformer
+            import onnxruntime  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                "The 'onnx' embedding backend requires sentence-transformers>=3.2 and optimum[onnxruntime]."
+            ) from e
+        model_kwargs = {"file_name": self.file_name} if self.file_name else None
+        return SentenceTransformer(self.model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+
+def build_embedding_backend(
+    backend: str,
+    model_name: str,
+    batch_size: int,
+    num_threads: Optional[int] = None,
+    onnx_file_name: Optional[str] = None,
+    socket_path: Optional[str] = None
+) -> EmbeddingBackend:
+    """Creates the configured backend ('torch', 'torch-int8', 'onnx' or 'remote') without loading it."""
+    if backend == "torch":
+        return TorchEmbeddingBackend(model_name, batch_size, num_threads=num_threads)
+    if backend == "torch-int8":
+        return QuantizedTorchEmbeddingBackend(model_name, batch_size, num_threads=num_threads)
+    if backend == "onnx":
+        return OnnxEmbeddingBackend(model_name, batch_size, file_name=onnx_file_name)
+    if backend == "remote":
+        from utils.embedding_server import RemoteEmbeddingBackend
+        return RemoteEmbeddingBackend(model_name, socket_path=socket_path)
+    raise ValueError(f"Unknown embedding backend '{backend}'. Expected 'torch', 'torch-int8', 'onnx' or 'remote'.")
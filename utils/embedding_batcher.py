@@ -0,0 +1,114 @@
+# utils/embedding_batcher.py
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from utils.metrics import EMBEDDING_BATCH_SIZE, EMBEDDING_ENCODE_DURATION
+
+class EmbeddingBatcher:
+    """
+    Collects encode requests from concurrent coroutines into micro-batches and
+    runs each batch on a dedicated worker thread, so CPU-bound encoding never
+    blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        num_workers: int = 1
+    ):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.num_workers = max(1, num_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.num_workers, thread_name_prefix="embedding")
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        # Strong references keep running batches from being garbage-collected mid-run
+        self._batches: Set[asyncio.Task] = set()
+
+    def _ensure_started(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.num_workers)
+            self._worker = asyncio.get_running_loop().create_task(self._collect_batches())
+
+    async def encode(self, texts: List[str]) -> np.ndarray:
+        """Encodes texts, sharing a batch with any other pending requests."""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((list(texts), future))
+        return await future
+
+    async def _collect_batches(self):
+        while True:
+            first = await self._queue.get()
+            batch = [first]
+            batch_size = len(first[0])
+            deadline = time.monotonic() + self.max_wait
+
+            # Keep gathering until the batch is full or the wait budget is spent
+            while batch_size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                batch_size += len(item[0])
+
+            # Bound the number of batches in flight to the worker pool size
+            await self._slots.acquire()
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: List[Tuple[List[str], asyncio.Future]]):
+        try:
+            flat_texts = [text for texts, _ in batch for text in texts]
+            loop = asyncio.get_running_loop()
+            EMBEDDING_BATCH_SIZE.observe(len(flat_texts))
+            started = time.perf_counter()
+            try:
+                vectors = await loop.run_in_executor(self._executor, self.encode_fn, flat_texts)
+            except Exception as e:
+                print(f"Error encoding embedding batch of {len(flat_texts)} texts: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            finally:
+                EMBEDDING_ENCODE_DURATION.observe(time.perf_counter() - started)
+
+            # Hand each caller back its own slice of the batch
+            offset = 0
+            for texts, future in batch:
+                if not future.done():
+                    future.set_result(vectors[offset:offset + len(texts)])
+                offset += len(texts)
+        finally:
+            self._slots.release()
+
+    async def close(self):
+        """Stops the collector task, waits for batches in flight and shuts down the worker threads."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+        self._executor.shutdown(wait=False)
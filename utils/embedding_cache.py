@@ -0,0 +1,155 @@
+# utils/embedding_cache.py
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+class EmbeddingCache:
+    """
+    A content-addressed LRU cache of embedding vectors with a byte budget.
+
+    Vectors are keyed by a hash of the model name and the text, stored as
+    compact float32/float16 arrays, and optionally persisted to disk so a
+    restarted process can reuse them. The in-memory tier never blocks on I/O;
+    the disk tier (`load_many` / `persist_many`) should be called from a
+    worker thread.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        dtype: str = "float16",
+        persist_dir: Optional[str] = None
+    ):
+        if dtype not in ("float16", "float32"):
+            raise ValueError("Embedding cache dtype must be 'float16' or 'float32'.")
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        self.dtype = np.dtype(dtype)
+        self.persist_dir = persist_dir
+        if persist_dir:
+            os.makedirs(persist_dir, exist_ok=True)
+
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    def key(self, text: str) -> str:
+        """Content address for a text under the configured model."""
+        digest = hashlib.sha256()
+        digest.update(self.model_name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.persist_dir, key[:2], f"{key}.npy")
+
+    def _load_from_disk(self, key: str) -> Optional[np.ndarray]:
+        if not self.persist_dir:
+            return None
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return np.load(path)
+        except (OSError, ValueError) as e:
+            print(f"Error reading cached embedding {path}: {e}")
+            return None
+
+    def _write_to_disk(self, key: str, vector: np.ndarray):
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so readers never see a partial array
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.save(f, vector)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error persisting embedding {path}: {e}")
+
+    def _insert(self, key: str, vector: np.ndarray):
+        # Caller holds the lock
+        if vector.nbytes > self.max_bytes:
+            return
+        existing = self._entries.pop(key, None)
+        if existing is not None:
+            self.current_bytes -= existing.nbytes
+        self._entries[key] = vector
+        self.current_bytes += vector.nbytes
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def get_many(self, texts: List[str]) -> Dict[int, np.ndarray]:
+        """Returns vectors (as float32) by position for every text held in memory. Never touches the disk."""
+        found = {}
+        keys = [self.key(text) for text in texts]
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._entries.get(key)
+                if vector is None:
+                    self.misses += 1
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                found[i] = vector.astype(np.float32)
+        return found
+
+    def load_many(self, texts: List[str]) -> Dict[int, np.ndarray]:
+        """
+        Reads vectors by position from the disk tier and promotes them into
+        memory. Blocking file I/O, done without holding the lock.
+        """
+        if not self.persist_dir:
+            return {}
+        keys = [self.key(text) for text in texts]
+        loaded = {i: self._load_from_disk(key) for i, key in enumerate(keys)}
+        loaded = {i: vector for i, vector in loaded.items() if vector is not None}
+        with self._lock:
+            for i, vector in loaded.items():
+                self._insert(keys[i], vector)
+            self.disk_hits += len(loaded)
+        return {i: vector.astype(np.float32) for i, vector in loaded.items()}
+
+    def put_many(self, texts: List[str], vectors: np.ndarray):
+        """Stores one vector per text in memory."""
+        with self._lock:
+            for key, compact in self._compact(texts, vectors):
+                self._insert(key, compact)
+
+    def persist_many(self, texts: List[str], vectors: np.ndarray):
+        """Writes one vector per text to the disk tier, if enabled. Blocking file I/O."""
+        if not self.persist_dir:
+            return
+        for key, compact in self._compact(texts, vectors):
+            self._write_to_disk(key, compact)
+
+    def _compact(self, texts: List[str], vectors: np.ndarray):
+        return [
+            (self.key(text), np.ascontiguousarray(vector, dtype=self.dtype))
+            for text, vector in zip(texts, vectors)
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "evictions": self.evictions
+            }
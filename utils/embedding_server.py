@@ -0,0 +1,256 @@
+# utils/embedding_server.py
+"""
+A shared embedding process for multi-worker deployments.
+
+One process loads the model and serves every uvicorn worker over a Unix
+socket, batching encode requests across all of them. Large results are
+handed back through POSIX shared memory instead of being pickled onto the
+socket; small ones are sent inline.
+
+    python -m utils.embedding_server
+
+Workers use it with EMBEDDING_BACKEND=remote; the server itself runs the
+backend named by EMBEDDING_SERVER_BACKEND.
+
+Wire protocol (both directions): a 4-byte big-endian length followed by a
+UTF-8 JSON object. Requests are {"texts": [...]}; responses are
+{"shm": name, "shape": [n, dim], "dtype": "float32"},
+{"data": base64, "shape": [n, dim], "dtype": "float32"} or {"error": message}.
+The server owns every shared memory block: the client copies the vectors
+out and sends {"release": name} (which gets no response), and the server
+unlinks the block then, when the connection closes, or after a TTL.
+"""
+
+import asyncio
+import base64
+import json
+import os
+import socket
+import struct
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.embedding_backends import EmbeddingBackend, build_embedding_backend
+from utils.embedding_batcher import EmbeddingBatcher
+
+_HEADER = struct.Struct(">I")
+
+def _encode_message(payload: Dict[str, Any]) -> bytes:
+    body = json.dumps(payload).encode("utf-8")
+    return _HEADER.pack(len(body)) + body
+
+class SharedBlocks:
+    """
+    Shared memory blocks handed to clients and not yet released. Each is
+    unlinked when its client releases it, when that client's connection
+    closes, or once it is older than `ttl_seconds`, so a client that times
+    out or crashes cannot leak segments in /dev/shm.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0):
+        self.ttl_seconds = ttl_seconds
+        # name -> (block, connection id, creation time)
+        self._blocks: Dict[str, Tuple[shared_memory.SharedMemory, int, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def write(self, vectors: np.ndarray, owner: int) -> Dict[str, Any]:
+        shm = shared_memory.SharedMemory(create=True, size=max(1, vectors.nbytes))
+        np.ndarray(vectors.shape, dtype=np.float32, buffer=shm.buf)[:] = vectors
+        self._blocks[shm.name] = (shm, owner, time.monotonic())
+        return {"shm": shm.name, "shape": list(vectors.shape), "dtype": "float32"}
+
+    def release(self, name: str):
+        entry = self._blocks.pop(name, None)
+        if entry is None:
+            return
+        shm = entry[0]
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def release_owner(self, owner: int):
+        for name in [name for name, (_, block_owner, _) in self._blocks.items() if block_owner == owner]:
+            self.release(name)
+
+    def release_expired(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        for name in [name for name, (_, _, created_at) in self._blocks.items() if created_at < cutoff]:
+            self.release(name)
+
+    def release_all(self):
+        for name in list(self._blocks):
+            self.release(name)
+
+class EmbeddingServer:
+    """Serves batched encode requests from many client processes over a Unix socket."""
+
+    def __init__(
+        self,
+        backend: EmbeddingBackend,
+        socket_path: str,
+        max_batch_size: int = 128,
+        max_wait_ms: float = 5.0,
+        inline_max_bytes: int = 65536,
+        shm_ttl_seconds: float = 60.0
+    ):
+        self.backend = backend
+        self.socket_path = socket_path
+        self.inline_max_bytes = inline_max_bytes
+        self.batcher = EmbeddingBatcher(backend.encode, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        self.blocks = SharedBlocks(ttl_seconds=shm_ttl_seconds)
+
+    def _pack_vectors(self, vectors: np.ndarray, owner: int) -> Dict[str, Any]:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.nbytes <= self.inline_max_bytes:
+            # A shared memory round trip costs more than sending a few KB on the socket
+            data = base64.b64encode(vectors.tobytes()).decode("ascii")
+            return {"data": data, "shape": list(vectors.shape), "dtype": "float32"}
+        return self.blocks.write(vectors, owner)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        owner = id(writer)
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    return # Client disconnected
+                (length,) = _HEADER.unpack(header)
+                request = json.loads(await reader.readexactly(length))
+                if "release" in request:
+                    self.blocks.release(request["release"])
+                    continue
+                try:
+                    vectors = await self.batcher.encode(request["texts"])
+                    response = self._pack_vectors(vectors, owner)
+                except Exception as e:
+                    print(f"Error serving embedding request: {e}")
+                    response = {"error": str(e)}
+                writer.write(_encode_message(response))
+                await writer.drain()
+        finally:
+            # Whatever the client never released is of no use to anyone now
+            self.blocks.release_owner(owner)
+            writer.close()
+
+    async def _expire_blocks(self):
+        while True:
+            await asyncio.sleep(max(1.0, self.blocks.ttl_seconds / 2))
+            self.blocks.release_expired()
+
+    async def serve_forever(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.backend.load)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        expiry_task = asyncio.create_task(self._expire_blocks())
+        print(f"Embedding server listening on {self.socket_path}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            expiry_task.cancel()
+            self.blocks.release_all()
+            await self.batcher.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+class RemoteEmbeddingBackend(EmbeddingBackend):
+    """Encodes by calling a shared EmbeddingServer, one connection per calling thread."""
+
+    def __init__(self, model_name: str, socket_path: str, connect_timeout: float = 60.0):
+        super().__init__(model_name)
+        self.socket_path = socket_path
+        self.connect_timeout = connect_timeout
+        self._local = threading.local()
+
+    @property
+    def loaded(self) -> bool:
+        return True
+
+    def load(self):
+        # Nothing to load locally; just check the server is reachable
+        self._connection()
+
+    def _connection(self) -> socket.socket:
+        conn: Optional[socket.socket] = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.settimeout(self.connect_timeout)
+            conn.connect(self.socket_path)
+            self._local.conn = conn
+        return conn
+
+    def _recv_exactly(self, conn: socket.socket, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = conn.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("Embedding server closed the connection.")
+            data.extend(chunk)
+        return bytes(data)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        conn = self._connection()
+        try:
+            conn.sendall(_encode_message({"texts": list(texts)}))
+            (length,) = _HEADER.unpack(self._recv_exactly(conn, _HEADER.size))
+            response = json.loads(self._recv_exactly(conn, length))
+        except (OSError, ConnectionError):
+            # Drop the broken connection so the next call reconnects
+            conn.close()
+            self._local.conn = None
+            raise
+        if "error" in response:
+            raise RuntimeError(f"Embedding server error: {response['error']}")
+        shape = tuple(response["shape"])
+        if "data" in response:
+            return np.frombuffer(base64.b64decode(response["data"]), dtype=response["dtype"]).reshape(shape).copy()
+
+        shm = shared_memory.SharedMemory(name=response["shm"])
+        # Attaching registers the block with this process's resource tracker, but the server owns it
+        resource_tracker.unregister(shm._name, "shared_memory")
+        try:
+            vectors = np.ndarray(shape, dtype=response["dtype"], buffer=shm.buf).copy()
+        finally:
+            shm.close()
+            try:
+                conn.sendall(_encode_message({"release": response["shm"]}))
+            except OSError:
+                # The server unlinks it when the connection drops
+                conn.close()
+                self._local.conn = None
+        return vectors
+
+def main():
+    from config import settings
+
+    if settings.EMBEDDING_SERVER_BACKEND == "remote":
+        raise ValueError("EMBEDDING_SERVER_BACKEND must be a local backend, not 'remote'.")
+    backend = build_embedding_backend(
+        backend=settings.EMBEDDING_SERVER_BACKEND,
+        model_name=settings.EMBEDDING_MODEL_NAME,
+        batch_size=settings.EMBEDDING_SERVER_MAX_BATCH_SIZE,
+        num_threads=settings.EMBEDDING_NUM_THREADS,
+        onnx_file_name=settings.EMBEDDING_ONNX_FILE_NAME
+    )
+    server = EmbeddingServer(
+        backend,
+        socket_path=settings.EMBEDDING_SERVER_SOCKET,
+        max_batch_size=settings.EMBEDDING_SERVER_MAX_BATCH_SIZE,
+        max_wait_ms=settings.EMBEDDING_SERVER_MAX_WAIT_MS,
+        inline_max_bytes=settings.EMBEDDING_SERVER_INLINE_MAX_BYTES,
+        shm_ttl_seconds=settings.EMBEDDING_SERVER_SHM_TTL_SECONDS
+    )
+    asyncio.run(server.serve_forever())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# utils/job_store.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+class JobStore:
+    """Interface for evaluation job records, stored as plain dicts."""
+
+    def create(self, job_id: str, request: Dict[str, Any]):
+        raise NotImplementedError
+
+    def update(self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        """Jobs that were queued or running, e.g. when the process last stopped."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class InMemoryJobStore(JobStore):
+    """Keeps jobs in process memory, dropping the oldest finished ones beyond `max_jobs`."""
+
+    def __init__(self, max_jobs: int = 100000):
+        self.max_jobs = max_jobs
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job_id: str, request: Dict[str, Any]):
+        now = time.time()
+        with self._lock:
+            self._jobs[job_id] = {
+                "job_id": job_id, "status": "queued", "request": request,
+                "result": None, "error": None, "created_at": now, "updated_at": now
+            }
+            if len(self._jobs) > self.max_jobs:
+                finished = [j for j in self._jobs.values() if j["status"] in ("completed", "failed")]
+                for job in sorted(finished, key=lambda j: j["updated_at"])[:len(self._jobs) - self.max_jobs]:
+                    del self._jobs[job["job_id"]]
+
+    def update(self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(status=status, result=result, error=error, updated_at=time.time())
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        return []
+
+class SQLiteJobStore(JobStore):
+    """Persists jobs to a local SQLite file so results survive restarts."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    request TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+
+    def create(self, job_id: str, request: Dict[str, Any]):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, status, request, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, json.dumps(request), now, now)
+            )
+
+    def update(self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE job_id = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id)
+            )
+
+    def _row_to_job(self, row) -> Dict[str, Any]:
+        job_id, status, request, result, error, created_at, updated_at = row
+        return {
+            "job_id": job_id, "status": status, "request": json.loads(request),
+            "result": json.loads(result) if result else None, "error": error,
+            "created_at": created_at, "updated_at": updated_at
+        }
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id, status, request, result, error, created_at, updated_at FROM jobs WHERE job_id = ?",
+                (job_id,)
+            ).fetchone()
+        return self._row_to_job(row) if row is not None else None
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id, status, request, result, error, created_at, updated_at FROM jobs "
+                "WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def build_job_store(backend: str, sqlite_path: str) -> JobStore:
+    """Creates the configured job store ('memory' or 'sqlite')."""
+    if backend == "memory":
+        return InMemoryJobStore()
+    if backend == "sqlite":
+        return SQLiteJobStore(path=sqlite_path)
+    raise ValueError(f"Unknown job store backend '{backend}'. Expected 'memory' or 'sqlite'.")
@@ -0,0 +1,144 @@
+# utils/llm_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+def make_cache_key(model: str, system_prompt: str, prompt: str, temperature: float, max_tokens: int) -> str:
+    """Builds a stable key for a completion request."""
+    payload = json.dumps(
+        {
+            "model": model,
+            "system": system_prompt,
+            "prompt": prompt,
+            "temperature": round(temperature, 4),
+            "max_tokens": max_tokens
+        },
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LLMCacheBackend:
+    """Interface for LLM response caches."""
+
+    # Whether get/set do blocking I/O and should run off the event loop
+    blocking = False
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class InMemoryLLMCache(LLMCacheBackend):
+    """An LRU cache of completions whose entries expire after `ttl_seconds`."""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+class SQLiteLLMCache(LLMCacheBackend):
+    """
+    A local on-disk completion cache that survives restarts. Every
+    `prune_every` writes, expired rows are deleted and the oldest rows
+    beyond `max_entries` are evicted.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, ttl_seconds: float = 3600.0, max_entries: int = 10000, prune_every: int = 100):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.prune_every = max(1, prune_every)
+        self._writes_since_prune = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_expiry ON llm_cache (expires_at)")
+            self._prune()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at < time.time():
+                with self._conn:
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            return value
+
+    def set(self, key: str, value: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + self.ttl_seconds)
+            )
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= self.prune_every:
+                self._prune()
+
+    def _prune(self):
+        # Caller holds the lock inside a transaction. Every entry has the same
+        # TTL, so the earliest expiry is also the oldest write.
+        self._writes_since_prune = 0
+        self._conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),))
+        self._conn.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            "SELECT key FROM llm_cache ORDER BY expires_at DESC, rowid DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def build_llm_cache(backend: str, max_entries: int, ttl_seconds: float, sqlite_path: str) -> Optional[LLMCacheBackend]:
+    """Creates the configured cache backend ('memory', 'sqlite' or 'none')."""
+    if backend == "memory":
+        return InMemoryLLMCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+    if backend == "sqlite":
+        return SQLiteLLMCache(path=sqlite_path, ttl_seconds=ttl_seconds, max_entries=max_entries)
+    if backend == "none":
+        return None
+    raise ValueError(f"Unknown LLM cache backend '{backend}'. Expected 'memory', 'sqlite' or 'none'.")
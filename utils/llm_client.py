@@ -1,34 +1,247 @@
 # utils/llm_client.py
 
+import asyncio
+import random
+import time
+from typing import AsyncIterator, Callable, Dict, Optional
 import openai
 from config import settings
+from utils.llm_cache import LLMCacheBackend, build_llm_cache, make_cache_key
+from utils.rate_limiter import TokenBucket, CircuitBreaker
+from utils.metrics import LLM_CACHE_LOOKUPS, LLM_REQUEST_DURATION, LLM_TOKENS
+
+SYSTEM_PROMPT = "You are a helpful assistant that provides concise and accurate information."
+
+# Errors worth retrying: rate limits, timeouts, dropped connections and 5xx responses
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError
+)
 
 class LLMClient:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache: Optional[LLMCacheBackend] = None):
         if not api_key:
             raise ValueError("OpenAI API key is required.")
-        self.client = openai.AsyncOpenAI(api_key=api_key)
+        # Retries are handled by our own scheduler below, so disable the SDK's
+        self.client = openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=settings.LLM_BASE_URL,
+            timeout=settings.LLM_REQUEST_TIMEOUT_SECONDS,
+            max_retries=0
+        )
         self.model = settings.LLM_MODEL_NAME
+        # Client-side scheduling: cap concurrency, pace requests and tokens per
+        # minute, and stop calling upstream while it is failing
+        self._concurrency = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        self.request_bucket = TokenBucket(settings.LLM_REQUESTS_PER_MINUTE)
+        self.token_bucket = TokenBucket(settings.LLM_TOKENS_PER_MINUTE)
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.LLM_CIRCUIT_RESET_SECONDS
+        )
+        self.cache = cache if cache is not None else build_llm_cache(
+            backend=settings.LLM_CACHE_BACKEND,
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+            sqlite_path=settings.LLM_CACHE_SQLITE_PATH
+        )
+        # Identical requests currently awaiting the API, shared by all callers
+        self._in_flight: Dict[str, asyncio.Task] = {}
 
     async def generate_text(
         self, 
         prompt: str, 
         temperature: float = 0.5,
-        max_tokens: int = 1500
+        max_tokens: int = 1500,
+        caller: str = "unknown",
+        validate: Optional[Callable[[str], bool]] = None,
+        bypass_cache: bool = False
     ) -> str:
-        """Generates text using the configured LLM."""
+        """
+        Generates text using the configured LLM. `caller` labels the call in metrics.
+
+        A reply is only cached if `validate` (when given) accepts it, so a
+        malformed reply is never served again. `bypass_cache` forces a fresh
+        upstream call, e.g. to retry after such a reply.
+        """
+        # Higher-temperature sampling is meant to vary, so only near-deterministic calls are shared
+        if temperature > settings.LLM_CACHE_MAX_TEMPERATURE:
+            return await self._create_completion(prompt, temperature, max_tokens, caller)
+
+        key = make_cache_key(self.model, SYSTEM_PROMPT, prompt, temperature, max_tokens)
+        if self.cache is not None and not bypass_cache:
+            cached = await self._cache_call(self.cache.get, key)
+            LLM_CACHE_LOOKUPS.inc(caller=caller, result="hit" if cached is not None else "miss")
+            if cached is not None:
+                return cached
+
+        if bypass_cache:
+            # Don't join an in-flight call: it may be the one that produced the bad reply
+            text = await self._create_completion(prompt, temperature, max_tokens, caller)
+        else:
+            # Singleflight: concurrent identical prompts share one upstream call. The call
+            # runs as its own task so a cancelled caller does not cancel it for the others.
+            task = self._in_flight.get(key)
+            if task is None:
+                task = asyncio.create_task(self._create_completion(prompt, temperature, max_tokens, caller))
+                self._in_flight[key] = task
+                task.add_done_callback(lambda t: self._in_flight.pop(key, None))
+            text = await asyncio.shield(task)
+
+        if self.cache is not None and text is not None and (validate is None or validate(text)):
+            await self._cache_call(self.cache.set, key, text)
+        return text
+
+    async def _cache_call(self, method, *args):
+        # Disk-backed caches do blocking I/O, so keep them off the event loop
+        if self.cache.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def close(self):
+        """Closes the response cache and the HTTP client."""
+        if self.cache is not None:
+            await self._cache_call(self.cache.close)
+        await self.client.close()
+
+    @staticmethod
+    def _estimate_tokens(prompt: str, max_tokens: int) -> int:
+        """Rough token cost of a request: ~4 characters per prompt token plus the completion allowance."""
+        return len(SYSTEM_PROMPT) // 4 + len(prompt) // 4 + max_tokens
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Reads the server's Retry-After hint (in seconds) from an API error, if present."""
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        headers = response.headers
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000.0
+            if headers.get("retry-after"):
+                return float(headers["retry-after"])
+        except ValueError:
+            return None
+        return None
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Exponential backoff with full jitter, never shorter than the server's Retry-After."""
+        delay = random.uniform(0, min(settings.LLM_BACKOFF_MAX_SECONDS, settings.LLM_BACKOFF_BASE_SECONDS * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def _request_with_retries(self, prompt: str, temperature: float, max_tokens: int, stream: bool = False):
+        """
+        Sends one chat completion through the client-side scheduler, retrying transient errors.
+        A stream keeps its concurrency slot while it is being read; the caller
+        must release `self._concurrency` once the stream is closed.
+        """
+        attempt = 0
+        while True:
+            # Fail fast while upstream is known to be down
+            self.circuit_breaker.before_call()
+            try:
+                await self._concurrency.acquire()
+                try:
+                    await self.request_bucket.acquire(1)
+                    await self.token_bucket.acquire(self._estimate_tokens(prompt, max_tokens))
+                    response = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=[
+                            {"role": "system", "content": SYSTEM_PROMPT},
+                            {"role": "user", "content": prompt}
+                        ],
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        stream=stream,
+                        # Ask for a final usage chunk so streamed calls are counted too
+                        **({"stream_options": {"include_usage": True}} if stream else {})
+                    )
+                except BaseException:
+                    self._concurrency.release()
+                    raise
+                if not stream:
+                    self._concurrency.release()
+            except RETRYABLE_ERRORS as e:
+                retry_after = self._retry_after(e)
+                if isinstance(e, openai.RateLimitError):
+                    # Upstream is up but pushing back: slow down everyone sharing this client
+                    self.circuit_breaker.record_success()
+                    self.request_bucket.throttle(retry_after)
+                    self.token_bucket.throttle(retry_after)
+                else:
+                    self.circuit_breaker.record_failure()
+                if attempt >= settings.LLM_MAX_RETRIES:
+                    print(f"An error occurred with the OpenAI API after {attempt + 1} attempts: {e}")
+                    raise
+                delay = self._backoff_delay(attempt, retry_after)
+                print(f"Transient OpenAI API error ({e.__class__.__name__}); retrying in {delay:.2f}s.")
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            except Exception as e:
+                # Upstream answered, so this does not count against the circuit
+                self.circuit_breaker.record_success()
+                print(f"An error occurred with the OpenAI API: {e}")
+                # In a real app, you might want to raise a custom exception
+                raise
+            except BaseException:
+                # Cancelled mid-call: no verdict on upstream, but a half-open trial must not stay claimed
+                self.circuit_breaker.release_trial()
+                raise
+
+            self.circuit_breaker.record_success()
+            self.request_bucket.recover()
+            self.token_bucket.recover()
+            return response
+
+    @staticmethod
+    def _record_usage(usage, caller: str):
+        if usage is None:
+            return
+        LLM_TOKENS.inc(usage.prompt_tokens or 0, caller=caller, kind="prompt")
+        LLM_TOKENS.inc(usage.completion_tokens or 0, caller=caller, kind="completion")
+
+    async def _create_completion(self, prompt: str, temperature: float, max_tokens: int, caller: str = "unknown") -> str:
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self._request_with_retries(prompt, temperature, max_tokens)
+            outcome = "success"
+        finally:
+            LLM_REQUEST_DURATION.observe(time.perf_counter() - started, caller=caller, outcome=outcome)
+        self._record_usage(response.usage, caller)
+        return response.choices[0].message.content
+
+    async def stream_text(
+        self,
+        prompt: str,
+        temperature: float = 0.5,
+        max_tokens: int = 1500,
+        caller: str = "unknown"
+    ) -> AsyncIterator[str]:
+        """Streams generated text from the configured LLM as it is produced, one delta at a time."""
+        started = time.perf_counter()
+        outcome = "error"
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that provides concise and accurate information."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            print(f"An error occurred with the OpenAI API: {e}")
-            # In a real app, you might want to raise a custom exception
-            raise
+            # Opening the stream is retried like any other call; once tokens flow, errors propagate
+            stream = await self._request_with_retries(prompt, temperature, max_tokens, stream=True)
+            try:
+                async for chunk in stream:
+                    # The final chunk carries usage and no choices
+                    self._record_usage(getattr(chunk, "usage", None), caller)
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                try:
+                    await stream.close()
+                finally:
+                    # Tokens keep arriving until the stream ends, so it holds its slot until then
+                    self._concurrency.release()
+            outcome = "success"
+        finally:
+            LLM_REQUEST_DURATION.observe(time.perf_counter() - started, caller=caller, outcome=outcome)
@@ -0,0 +1,107 @@
+# utils/rate_limiter.py
+
+import asyncio
+import time
+from typing import Optional
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker is open and calls are being rejected."""
+
+class TokenBucket:
+    """
+    An asyncio token bucket refilled continuously at `rate_per_minute`.
+
+    The rate is adaptive: `throttle` cuts it (and can pause refills entirely
+    for a Retry-After interval) when upstream pushes back, and `recover`
+    raises it gradually back to the configured rate.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None, min_rate_fraction: float = 0.1):
+        self.max_rate = rate_per_minute / 60.0
+        self.rate = self.max_rate
+        self.min_rate = self.max_rate * min_rate_fraction
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        start = max(self._updated_at, self._paused_until)
+        if now > start:
+            self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, amount: float = 1.0):
+        """Waits until `amount` tokens are available and takes them."""
+        # A request larger than the bucket could never be satisfied; let it drain the bucket instead
+        amount = min(amount, self.capacity)
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = max(self._paused_until - now, 0.0) + (amount - self.tokens) / self.rate
+            # Sleep without the lock so smaller requests can be served meanwhile
+            await asyncio.sleep(wait)
+
+    def throttle(self, retry_after: Optional[float] = None, factor: float = 0.5):
+        """Reduces the refill rate after upstream rate limiting, optionally pausing refills."""
+        now = time.monotonic()
+        self._refill(now)
+        self.rate = max(self.min_rate, self.rate * factor)
+        if retry_after:
+            self.tokens = 0.0
+            self._paused_until = max(self._paused_until, now + retry_after)
+
+    def recover(self, step_fraction: float = 0.05):
+        """Raises the refill rate back toward the configured maximum after a success."""
+        if self.rate < self.max_rate:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.max_rate * step_fraction)
+
+class CircuitBreaker:
+    """
+    Fails fast after `failure_threshold` consecutive failures. After
+    `reset_timeout` seconds a single trial call is let through; its outcome
+    closes the circuit again or re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_progress = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        state = self.state
+        if state == "open" or (state == "half_open" and self._trial_in_progress):
+            raise CircuitOpenError("LLM upstream is unavailable; circuit breaker is open.")
+        if state == "half_open":
+            self._trial_in_progress = True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_progress = False
+
+    def release_trial(self):
+        """Frees the half-open trial slot when the trial call ended without an outcome (e.g. was cancelled)."""
+        self._trial_in_progress = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial_in_progress or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._trial_in_progress = False
@@ -0,0 +1,137 @@
+# utils/score_store.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+class ScoreStore:
+    """
+    Interface for the raw stage scores of each evaluation, kept so final scores
+    can be rebuilt with different weights without re-running the evaluation.
+    Records are plain dicts: evaluation_id, cohort_id, student_id, raw_scores, created_at.
+    """
+
+    def save_many(self, records: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    def save(self, evaluation_id: str, raw_scores: Dict[str, float], cohort_id: Optional[str] = None, student_id: Optional[str] = None):
+        self.save_many([{
+            "evaluation_id": evaluation_id, "cohort_id": cohort_id,
+            "student_id": student_id, "raw_scores": raw_scores
+        }])
+
+    def get_many(self, evaluation_ids: List[str]) -> List[Dict[str, Any]]:
+        """The records that exist, in the order requested."""
+        raise NotImplementedError
+
+    def by_cohort(self, cohort_id: str) -> List[Dict[str, Any]]:
+        """Every record in the cohort, oldest first."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class InMemoryScoreStore(ScoreStore):
+    """Keeps records in process memory, dropping the oldest beyond `max_records`."""
+
+    def __init__(self, max_records: int = 100000):
+        self.max_records = max_records
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def save_many(self, records: List[Dict[str, Any]]):
+        now = time.time()
+        with self._lock:
+            for record in records:
+                self._records[record["evaluation_id"]] = {**record, "created_at": now}
+            # Dicts keep insertion order, so the first keys are the oldest
+            for evaluation_id in list(self._records)[:max(0, len(self._records) - self.max_records)]:
+                del self._records[evaluation_id]
+
+    def get_many(self, evaluation_ids: List[str]) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(self._records[i]) for i in evaluation_ids if i in self._records]
+
+    def by_cohort(self, cohort_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(r) for r in self._records.values() if r["cohort_id"] == cohort_id]
+
+class SQLiteScoreStore(ScoreStore):
+    """Persists records to a local SQLite file, indexed by cohort."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS scores (
+                    evaluation_id TEXT PRIMARY KEY,
+                    cohort_id TEXT,
+                    student_id TEXT,
+                    raw_scores TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS scores_cohort ON scores (cohort_id, created_at)")
+
+    def save_many(self, records: List[Dict[str, Any]]):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO scores (evaluation_id, cohort_id, student_id, raw_scores, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (r["evaluation_id"], r.get("cohort_id"), r.get("student_id"), json.dumps(r["raw_scores"]), now)
+                    for r in records
+                ]
+            )
+
+    def _row_to_record(self, row) -> Dict[str, Any]:
+        evaluation_id, cohort_id, student_id, raw_scores, created_at = row
+        return {
+            "evaluation_id": evaluation_id, "cohort_id": cohort_id, "student_id": student_id,
+            "raw_scores": json.loads(raw_scores), "created_at": created_at
+        }
+
+    def get_many(self, evaluation_ids: List[str]) -> List[Dict[str, Any]]:
+        rows = []
+        # Stay under SQLite's limit on bound parameters per statement
+        for start in range(0, len(evaluation_ids), 500):
+            chunk = list(evaluation_ids[start:start + 500])
+            with self._lock:
+                rows.extend(self._conn.execute(
+                    f"SELECT evaluation_id, cohort_id, student_id, raw_scores, created_at FROM scores "
+                    f"WHERE evaluation_id IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall())
+        found = {row[0]: self._row_to_record(row) for row in rows}
+        return [found[i] for i in evaluation_ids if i in found]
+
+    def by_cohort(self, cohort_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT evaluation_id, cohort_id, student_id, raw_scores, created_at FROM scores "
+                "WHERE cohort_id = ? ORDER BY created_at",
+                (cohort_id,)
+            ).fetchall()
+        return [self._row_to_record(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def build_score_store(backend: str, sqlite_path: str) -> ScoreStore:
+    """Creates the configured score store ('memory' or 'sqlite')."""
+    if backend == "memory":
+        return InMemoryScoreStore()
+    if backend == "sqlite":
+        return SQLiteScoreStore(path=sqlite_path)
+    raise ValueError(f"Unknown score store backend '{backend}'. Expected 'memory' or 'sqlite'.")